@@ -1,233 +1,314 @@
 import asyncio
-import feedparser
 import logging
+import os
 import random
-import json
+import contextlib
 import time
-import cv2
-import numpy as np
-import csv
-from pyppeteer import launch
-from PIL import Image
-from PIL import ImageGrab
-from io import BytesIO
+from browser import MEDIUM_URL, BrowserManager, StartupTimer, medium_session_valid
+from config import CONFIG_FILE_PATH, BotConfig
+from feeds import FeedCache, fetch_all_feed_links
+from frontier import ArticleFrontier
+from frames import PageScreenshotFrameSource, make_frame_source, match_page_strips
+from locator import TEMPLATE_STRATEGY, ElementLocator, LocatorTarget
+from recorder import CaptureRecorder, record_detection, record_dom
+from resources import resource_policy
+from session import ArticleSession
+from tracing import STAGE, configure_tracing, trace_span, traced_sleep, tracer
+from visited import open_visited_store
+from vision import FRAME_SKIP_STATS, FrameChangeDetector, TemplateRegistry, configure_vision_executor, locate_templates, run_vision
 
 # Logging Configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Loading Configuration
-CONFIG_FILE_PATH = 'config.json'
+# Loading Configuration (every setting and its default is described in config.py)
 VISITED_URLS_FILE_PATH = 'visited_urls.csv'
+VISITED_INDEX_FILE_PATH = 'visited_urls.db'
+FEED_CACHE_FILE_PATH = 'feed_cache.json'
+FRONTIER_FILE_PATH = 'frontier.json'
+MAX_LOAD_ATTEMPTS = 3  # Times an article that fails to load is retried before the frontier drops it
 
-with open(CONFIG_FILE_PATH, 'r') as config_file:
-    config = json.load(config_file)
+config = BotConfig.load(CONFIG_FILE_PATH).check_required()
 
 EMAIL = config['EMAIL']
 PASSWORD = config['PASSWORD']
 TAGS = config['TAGS']
+HEADLESS = config['HEADLESS']
+FRAME_SOURCE = config['FRAME_SOURCE'] or ('viewport' if HEADLESS else 'desktop')
+if HEADLESS and FRAME_SOURCE == 'desktop':
+    logging.info("There is no desktop to grab in headless mode, using the 'viewport' frame source instead.")
+    FRAME_SOURCE = 'viewport'
+TILED_MATCHING = config['TILED_MATCHING']
+VISION_THREADS = config['VISION_THREADS']
+VISITED_STORE = config['VISITED_STORE']
+VISITED_FSYNC = config['VISITED_FSYNC']
+ARTICLE_STAGES = config['ARTICLE_STAGES']
+BROWSER_PROFILE_DIR = config['BROWSER_PROFILE_DIR']
+MAX_BROWSER_MEMORY_MB = config['MAX_BROWSER_MEMORY_MB']
+RESTART_BROWSER_EVERY = config['RESTART_BROWSER_EVERY']
+TAB_POOL_SIZE = config['TAB_POOL_SIZE']
+TRACE_FILE = config['TRACE_FILE']
+RESOURCE_PROFILE = config['RESOURCE_PROFILE']
+MEDIUM_BASE_URL = config['MEDIUM_BASE_URL'].rstrip('/')
+MEDIUM_FEED_URL = MEDIUM_BASE_URL + '/feed/tag/{tag}'
+RECORD_DIR = config['RECORD_DIR']
+LOGIN_URL = config['LOGIN_URL']
 
 # Setting the Path for Chromium and Template Images
-CHROMIUM_PATH = r'chrome\win64-125.0.6422.60\chrome-win64\chrome.exe'
-CLAP_BUTTON_TEMPLATE_PATH = r'buttontemps\clap_button_template.png'
-BLACK_CLAP_BUTTON_TEMPLATE_PATH = r'buttontemps\black_clap_button_template.png'
-FOLLOW_BUTTON_TEMPLATE_BLACK_PATH = r'buttontemps\follow_button_template_black.png'
-FOLLOW_BUTTON_TEMPLATE_WHITE_PATH = r'buttontemps\follow_button_template_white.png'
+CHROMIUM_PATH = config['CHROMIUM_PATH']
+VIEWPORT = config['VIEWPORT'] or ({'width': 1366, 'height': 900, 'deviceScaleFactor': 1} if HEADLESS else None)
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'buttontemps')
+CLAP_BUTTON_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, 'clap_button_template.png')
+BLACK_CLAP_BUTTON_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, 'black_clap_button_template.png')
+FOLLOW_BUTTON_TEMPLATE_BLACK_PATH = os.path.join(TEMPLATE_DIR, 'follow_button_template_black.png')
+FOLLOW_BUTTON_TEMPLATE_WHITE_PATH = os.path.join(TEMPLATE_DIR, 'follow_button_template_white.png')
+
+# Template Images are decoded once in main() and looked up by name afterwards.
+# A missing template only disables the vision fallback that needs it; the DOM locator still runs.
+TEMPLATE_PATHS = {
+    'clap': CLAP_BUTTON_TEMPLATE_PATH,
+    'black_clap': BLACK_CLAP_BUTTON_TEMPLATE_PATH,
+    'follow_black': FOLLOW_BUTTON_TEMPLATE_BLACK_PATH,
+    'follow_white': FOLLOW_BUTTON_TEMPLATE_WHITE_PATH,
+}
+TEMPLATES = TemplateRegistry()
+
+# Region-of-interest hints as (left, top, right, bottom) fractions of the frame.
+# Matching falls back to the whole frame when nothing in the hint clears the threshold.
+CLAP_BUTTON_ROI = (0.0, 0.5, 1.0, 1.0)  # The clap bar sits in the lower band of the viewport
+FOLLOW_BUTTON_ROI = (0.0, 0.0, 1.0, 0.25)  # The author header is near the top of the page
+
+CLAP_BUTTON_THRESHOLD = 0.51  # Adjusted threshold
+
+# DOM-First Element Locator; template matching is the fallback
+LOCATOR = ElementLocator([
+    LocatorTarget('clap', ['button[data-testid="headerClapButton"]', 'button[data-testid="footerClapButton"]'], ['clap']),
+    # The same button reads "Following" once the author is followed; clicking that would unfollow
+    LocatorTarget('follow', ['button.follow', 'button[data-testid="headerFollowButton"]'], ['follow'], exact_labels=True),
+])
+
+# Capture Recorder for replay.py; off unless RECORD_DIR is set
+RECORDER = CaptureRecorder(RECORD_DIR) if RECORD_DIR else None
 
 # Loading and Saving Visited URLs
 def load_visited_urls():
-    """Load visited URLs from a CSV file."""
-    visited_urls = set()
-    try:
-        with open(VISITED_URLS_FILE_PATH, mode='r', newline='', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                visited_urls.add(row[0])
-        logging.info(f"Loaded {len(visited_urls)} visited URLs from {VISITED_URLS_FILE_PATH}")
-    except FileNotFoundError:
-        logging.info('Visited URLs file not found. A new one will be created.')
-    return visited_urls
-
-def save_visited_urls(visited_urls):
-    """Save visited URLs to a CSV file."""
+    """Open the visited store: the SQLite index by default, or the append-only CSV journal."""
+    return open_visited_store(VISITED_STORE, VISITED_URLS_FILE_PATH, VISITED_INDEX_FILE_PATH, VISITED_FSYNC)
+
+def save_visited_url(visited_urls, url):
+    """Record one visited URL; the write happens on the store's background thread."""
     try:
-        with open(VISITED_URLS_FILE_PATH, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            for url in visited_urls:
-                writer.writerow([url])
-        logging.info(f"Visited URLs successfully saved to {VISITED_URLS_FILE_PATH}")
+        with trace_span('persist.visited'):
+            visited_urls.add(url)
     except Exception as e:
-        logging.error(f"Error saving visited URLs to {VISITED_URLS_FILE_PATH}: {e}")
-        print(f"Error saving visited URLs to {VISITED_URLS_FILE_PATH}: {e}")
+        logging.error(f"Error saving visited URL {url}: {e}")
+        print(f"Error saving visited URL {url}: {e}")
 
 # Fetching RSS Article Links
-def fetch_rss_article_links(tag, articleURLsVisited):
-    logging.info(f'Fetching articles for tag: {tag}')
-    feed_url = f'https://medium.com/feed/tag/{tag.replace(" ", "-").lower()}'
-    feed = feedparser.parse(feed_url)
-    article_urls = []
-
-    if 'entries' not in feed:
-        logging.error(f'No entries found in the RSS feed for tag: {tag}')
-        return article_urls
-
-    for entry in feed.entries:
-        link = entry.link
-        if link not in articleURLsVisited:
-            logging.info(f'Found new article: {link}')
-            article_urls.append(link)
-
-    return article_urls
-
-# Taking a Screenshot
-async def take_screenshot(page=None):
-    """Takes a screenshot of the current page or the entire screen if page is None."""
-    if page is None:
-        screenshot = ImageGrab.grab()
-        return cv2.cvtColor(np.array(screenshot), cv2.COLOR_BGR2GRAY)
-    else:
-        screenshot = await page.screenshot(fullPage=True)
-        return np.array(Image.open(BytesIO(screenshot)))
+FEED_CACHE = FeedCache(FEED_CACHE_FILE_PATH)
+
+async def fetch_all_rss_article_links(tags, visited_urls):
+    """Fetch every tag's feed concurrently and return {tag: new article links}."""
+    logging.info(f'Fetching articles for tags: {", ".join(tags)}')
+    feed_links = await fetch_all_feed_links(tags, FEED_CACHE, MEDIUM_FEED_URL)
+    articles_by_tag = {}
+    for tag, links in feed_links.items():
+        articles_by_tag[tag] = visited_urls.unvisited(links)
+        for link in articles_by_tag[tag]:
+            logging.info(f'Found new article for {tag}: {link}')
+    return articles_by_tag
 
 # Finding the Follow Button
-def find_follow_button(image, template_paths, threshold=0.6):
+def find_follow_button(image, template_names, threshold=0.6, roi=FOLLOW_BUTTON_ROI):
     """Uses template matching to find the follow button in the image."""
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
-    for template_path in template_paths:
-        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-        result = cv2.matchTemplate(gray_image, template, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    templates = [TEMPLATES[template_name] for template_name in template_names]
+    started = time.perf_counter()
+    matches = locate_templates(image, templates, threshold, roi)
+    record_detection('follow', image, templates, roi, threshold, matches, time.perf_counter() - started)
+    for template in templates:
+        logging.info(f"Template matching value for {template.path}: {matches[template.name][0]}")
 
-        logging.info(f"Template matching value for {template_path}: {max_val}")
+    _, max_loc = matches.first(template_names, threshold)
+    return max_loc
 
-        if max_val >= threshold:
-            return max_loc
-    return None
+async def find_follow_button_tiled(page, template_names, threshold=0.6):
+    """Finds the follow button strip by strip and returns its centre in CSS page coordinates."""
+    templates = [TEMPLATES[template_name] for template_name in template_names]
+    max_val, center, template = await match_page_strips(page, templates, threshold)
+
+    logging.info(f"Best tiled template matching value: {max_val}" + (f" for {template.path}" if template else ""))
 
-# Clapping on an Article
-def find_clap_button(image, template_path):
-    """Uses template matching to find the clap button in the image."""
-    template = cv2.imread(template_path, 0)
-    result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(result)
-    
-    logging.info(f"Template matching value for {template_path}: {max_val}")
-    
-    threshold = 0.51  # Adjusted threshold
     if max_val >= threshold:
-        return max_loc
+        return center
     return None
 
-async def clap_article(page):
+# Clapping on an Article
+def find_clap_buttons(image, template_names, roi=CLAP_BUTTON_ROI):
+    """Matches every clap template against the image in one pass and returns the MatchResult."""
+    templates = [TEMPLATES[template_name] for template_name in template_names]
+    started = time.perf_counter()
+    matches = locate_templates(image, templates, CLAP_BUTTON_THRESHOLD, roi)
+    record_detection('clap', image, templates, roi, CLAP_BUTTON_THRESHOLD, matches, time.perf_counter() - started)
+    for template in templates:
+        logging.info(f"Template matching value for {template.path}: {matches[template.name][0]}")
+    return matches
+
+async def document_to_viewport_coords(page, center):
+    """Full-page screenshots are in document coordinates; mouse clicks are relative to the viewport.
+    Scrolls the point into view first when it lies outside the viewport."""
+    viewport = await page.evaluate('({ height: window.innerHeight, scrollX: window.scrollX, scrollY: window.scrollY })')
+    if not viewport['scrollY'] <= center[1] <= viewport['scrollY'] + viewport['height']:
+        await page.evaluate(f'window.scrollTo(window.scrollX, {center[1]} - window.innerHeight / 2)')
+        viewport = await page.evaluate('({ height: window.innerHeight, scrollX: window.scrollX, scrollY: window.scrollY })')
+    return center[0] - viewport['scrollX'], center[1] - viewport['scrollY']
+
+async def find_clap_target(page):
+    """Vision fallback: returns (template name, viewport centre) of the clap button, or None."""
+    frame_source = make_frame_source(FRAME_SOURCE, page)
+    change_detector = FrameChangeDetector()
+    await record_dom('clap', page)
     try:
+        await frame_source.start()
         for attempt in range(5):  # Try up to 5 times
-            screenshot = await take_screenshot()
-
-            black_clap_button_location = find_clap_button(screenshot, BLACK_CLAP_BUTTON_TEMPLATE_PATH)
-            if black_clap_button_location:
-                logging.info("Black clap button found, waiting and clapping once, then skipping to next article.")
-                await asyncio.sleep(random.uniform(3, 5))
-                template = cv2.imread(BLACK_CLAP_BUTTON_TEMPLATE_PATH, 0)
-                h, w = template.shape
-                center_x = black_clap_button_location[0] + w // 2
-                center_y = black_clap_button_location[1] + h // 2
-                await page.mouse.click(center_x, center_y)
-                await asyncio.sleep(5)
-                return
-
-            clap_button_location = find_clap_button(screenshot, CLAP_BUTTON_TEMPLATE_PATH)
-            if clap_button_location:
-                logging.info("Clap button found.")
-                template = cv2.imread(CLAP_BUTTON_TEMPLATE_PATH, 0)
-                h, w = template.shape
-                center_x = clap_button_location[0] + w // 2
-                center_y = clap_button_location[1] + h // 2
-
-                times_to_clap = random.randint(11, 22)
-                for _ in range(times_to_clap):
-                    await page.mouse.click(center_x, center_y)
-                    await asyncio.sleep(random.uniform(0.1, 0.3))
-                logging.info(f'Clapped {times_to_clap} times')
-                return
+            screenshot = await frame_source.grab()
+            matches = await run_vision(change_detector.cached, screenshot)
+            if matches is None:
+                matches = await run_vision(lambda: change_detector.remember(screenshot, find_clap_buttons(screenshot, ['black_clap', 'clap'])))
             else:
-                logging.info('Clap button not found, scrolling and retrying...')
-                await page.evaluate('window.scrollBy(0, window.innerHeight / 2)')
-                await asyncio.sleep(2)
+                logging.info('Frame unchanged since the last attempt, reusing the previous match results.')
+
+            template_name, location = matches.first(['black_clap', 'clap'], CLAP_BUTTON_THRESHOLD)
+            if location:
+                center = frame_source.to_page_coords(*TEMPLATES[template_name].center(location))
+                if getattr(frame_source, 'full_page', False):
+                    center = await document_to_viewport_coords(page, center)
+                return template_name, center
+
+            logging.info('Clap button not found, scrolling and retrying...')
+            await page.evaluate('window.scrollBy(0, window.innerHeight / 2)')
+            await traced_sleep(2, 'sleep.scroll')
         logging.info('Failed to find the clap button after 5 attempts.')
+        return None
+    finally:
+        await frame_source.stop()
+        if change_detector.skipped:
+            logging.info(f"Skipped {change_detector.skipped} of {change_detector.skipped + change_detector.matched} template passes on unchanged frames "
+                         f"({FRAME_SKIP_STATS['skipped']} skipped this run)")
+
+def vision_fallback(template_names, fallback):
+    """The locator's template fallback, or None when any of its templates failed to load."""
+    return fallback if all(name in TEMPLATES for name in template_names) else None
+
+async def clap_article(page):
+    try:
+        strategy, hit = await LOCATOR.locate(page, 'clap', fallback=vision_fallback(['black_clap', 'clap'], lambda: find_clap_target(page)))
+        if strategy is None:
+            return
+        if strategy == TEMPLATE_STRATEGY:
+            template_name, (center_x, center_y) = hit
+        else:
+            # A clap button already in its pressed state is the DOM's black clap: clap once only
+            template_name, center_x, center_y = 'black_clap' if hit['pressed'] else 'clap', hit['x'], hit['y']
+
+        if template_name == 'black_clap':
+            logging.info("Black clap button found, waiting and clapping once, then skipping to next article.")
+            await traced_sleep(random.uniform(3, 5))
+            with trace_span('click', target='black_clap'):
+                await page.mouse.click(center_x, center_y)
+            await traced_sleep(5)
+            return True
+
+        logging.info("Clap button found.")
+        times_to_clap = random.randint(11, 22)
+        for _ in range(times_to_clap):
+            with trace_span('click', target='clap'):
+                await page.mouse.click(center_x, center_y)
+            await traced_sleep(random.uniform(0.1, 0.3), 'sleep.clap')
+        logging.info(f'Clapped {times_to_clap} times')
+        return True
     except Exception as e:
         logging.error(f'Error while clapping: {e}')
+    return False
 
 # Detecting the Follow Button using Template Matching
 async def detect_follow_button(page):
-    screenshot = await take_screenshot(page)
-    follow_button_location = find_follow_button(screenshot, [FOLLOW_BUTTON_TEMPLATE_BLACK_PATH, FOLLOW_BUTTON_TEMPLATE_WHITE_PATH])
-    return follow_button_location
+    """Returns the follow button's centre in CSS page coordinates, or None."""
+    await record_dom('follow', page)
+    if TILED_MATCHING:
+        return await find_follow_button_tiled(page, ['follow_black', 'follow_white'])
+    frame_source = PageScreenshotFrameSource(page)
+    await frame_source.start()
+    screenshot = await frame_source.grab()
+    follow_button_location = await run_vision(find_follow_button, screenshot, ['follow_black', 'follow_white'])
+    if follow_button_location:
+        return frame_source.to_page_coords(*TEMPLATES['follow_black'].center(follow_button_location))
+    return None
 
-# Detecting the Follow Button using CSS Selector
-async def detect_follow_button_css(page):
-    try:
-        await page.waitForSelector('button.follow', timeout=5000)
-        logging.info("Follow button found using CSS selector.")
-        return True
-    except Exception as e:
-        logging.info("Follow button not found using CSS selector.")
-        return False
+async def detect_follow_button_center(page):
+    """Template matching fallback for the locator: the follow button's centre in page coordinates, or None."""
+    center = await detect_follow_button(page)
+    if center is None:
+        logging.info("Follow button not found using template matching.")
+    return center
 
 # Clicking the Follow Button
-async def click_follow_button(page, location):
-    """Simulates a click on the detected 'Follow' button."""
-    template = cv2.imread(FOLLOW_BUTTON_TEMPLATE_BLACK_PATH, cv2.IMREAD_GRAYSCALE)
-    h, w = template.shape
-    center_x = location[0] + w // 2
-    center_y = location[1] + h // 2
-    viewport_size = await page.evaluate('({ width: window.innerWidth, height: window.innerHeight })')
+async def click_follow_button(page, center):
+    """Simulates a click on the detected 'Follow' button, given as a centre point in page coordinates."""
+    viewport_size = await page.evaluate('({ width: window.innerWidth, height: window.innerHeight, scrollX: window.scrollX, scrollY: window.scrollY })')
     logging.info(f"Viewport size: {viewport_size}")
+    center_x = center[0] - viewport_size['scrollX']
+    center_y = center[1] - viewport_size['scrollY']
 
     # Ensure the button is within the viewport
     if 0 <= center_x <= viewport_size['width'] and 0 <= center_y <= viewport_size['height']:
-        await page.mouse.click(center_x, center_y)
+        with trace_span('click', target='follow'):
+            await page.mouse.click(center_x, center_y)
         logging.info(f"Clicked Follow button at coordinates: ({center_x}, {center_y})")
     else:
         logging.info("Follow button is not within the viewport.")
 
 # Reading and Clapping Articles
-async def read_and_clap_article(browser, url, visited_urls):
-    page = await browser.newPage()
-    await page.goto(url)
-    
-    await asyncio.sleep(random.uniform(3, 5))
+async def clap_stage(page):
+    await traced_sleep(random.uniform(3, 5))
 
     await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-    await asyncio.sleep(45)
+    await traced_sleep(45, 'sleep.read')
 
-    await clap_article(page)
-    await page.close()
-
-    visited_urls.add(url)
-    save_visited_urls(visited_urls)
-    logging.info(f'Visited and clapped article: {url}')
+    return await clap_article(page)
 
 # Reading and Following Articles
-async def read_and_follow_article(browser, url, visited_urls):
-    page = await browser.newPage()
-    await page.goto(url)
-    await asyncio.sleep(random.uniform(5, 15))  # Add delay of 5-15 seconds before finding and clicking 'Follow'
-    
-    follow_button_location = await detect_follow_button(page)
-    if follow_button_location:
-        await click_follow_button(page, follow_button_location)
+async def follow_stage(page):
+    await page.evaluate('window.scrollTo(0, 0)')
+    await traced_sleep(random.uniform(5, 15))  # Add delay of 5-15 seconds before finding and clicking 'Follow'
+
+    strategy, hit = await LOCATOR.locate(page, 'follow', fallback=vision_fallback(['follow_black', 'follow_white'], lambda: detect_follow_button_center(page)))
+    if strategy == TEMPLATE_STRATEGY:
+        await click_follow_button(page, hit)
+    elif strategy:
+        await click_follow_button(page, (hit['pageX'], hit['pageY']))
     else:
-        logging.info("Follow button not found using template matching.")
-
-    css_detected = await detect_follow_button_css(page)
-    if css_detected:
-        logging.info("Follow button found and clicked using CSS selector.")
-    else:
-        logging.info("Follow button not found using CSS selector.")
-    
-    await page.close()
-    visited_urls.add(url)
-    save_visited_urls(visited_urls)
-    logging.info(f'Visited and followed article: {url}')
+        logging.info("Follow button not found.")
+    return strategy
+
+STAGES = {
+    'clap': clap_stage,
+    'follow': follow_stage,
+}
+
+# Reading an Article
+async def read_article(browser_manager, url, visited_urls, stage_names=ARTICLE_STAGES):
+    """Loads the article once, runs every configured stage on it, then records the visit once."""
+    session = ArticleSession(browser_manager, url, [(name, STAGES[name]) for name in stage_names], resource_policy(RESOURCE_PROFILE))
+    with RECORDER.article(url) if RECORDER else contextlib.nullcontext() as recording:
+        results = await session.run()
+        if recording is not None:
+            recording.timings, recording.results = session.timings, results
+    if not session.navigated():
+        # Left unvisited; main queues it again in the frontier
+        logging.info(f'Skipping article that failed to load: {url}')
+        return results
+    save_visited_url(visited_urls, url)
+    logging.info(f'Visited article: {url}')
+    return results
 
 # Logging into Medium via Facebook
 async def login_to_medium(page):
@@ -240,6 +321,10 @@ async def login_to_medium(page):
         "&cancel_url=https%3A%2F%2Fmedium.com%2Fm%2Fcallback%2Fv2%2Ffacebook%3Ferror%3Daccess_denied%26error_code%3D200%26error_description%3DPermissions%2Berror%26error_reason%3Duser_denied%26state%3Dfacebook"
         "-%257Chttps%253A%252F%252Fmedium.com%252F%253Fsource%253Dlogin-------------------------------------%257Clogin%257C9ffcfc83a831949427d0923d0ce8cced%257Ca6b0fc52708cb75331731cb67d9bb9bf811ca3bad40a361abbd1d2a45c6c79a0%23_%3D_&display=page&locale=en_US&pl_dbl=0"
     )
+    if LOGIN_URL:
+        facebook_login_url = LOGIN_URL
+    elif MEDIUM_BASE_URL != MEDIUM_URL:
+        facebook_login_url = f'{MEDIUM_BASE_URL}/login.php'
     await page.goto(facebook_login_url)
     logging.info('Logging in to Facebook...')
     
@@ -250,30 +335,85 @@ async def login_to_medium(page):
     await page.waitForNavigation()
     logging.info('Logged in successfully.')
 
+async def ensure_logged_in(page):
+    """Reuses the profile's Medium session when it is still valid, otherwise runs the login flow.
+    Returns which path was taken."""
+    if BROWSER_PROFILE_DIR and await medium_session_valid(page, MEDIUM_BASE_URL):
+        logging.info('Reusing the Medium session from the browser profile.')
+        return 'session reuse'
+    await login_to_medium(page)
+    return 'login'
+
+def browser_launch_options():
+    launch_options = {'headless': HEADLESS}
+    if CHROMIUM_PATH:
+        launch_options['executablePath'] = CHROMIUM_PATH
+    if BROWSER_PROFILE_DIR:
+        launch_options['userDataDir'] = BROWSER_PROFILE_DIR
+    if VIEWPORT:
+        launch_options['defaultViewport'] = VIEWPORT
+    if HEADLESS:
+        # No compositor window to feed, and /dev/shm is often tiny on servers and containers
+        launch_options['args'] = ['--disable-gpu', '--disable-dev-shm-usage']
+    return launch_options
+
 # Main Function
 async def main():
-    browser = await launch(headless=False, executablePath=CHROMIUM_PATH)
-    page = await browser.newPage()
-    
-    await login_to_medium(page)
-    
+    startup = StartupTimer()
+    configure_tracing(TRACE_FILE)
+    configure_vision_executor(VISION_THREADS)
+    await run_vision(TEMPLATES.load_all, TEMPLATE_PATHS, missing_ok=True)
+    startup.mark('templates')
     visited_urls = load_visited_urls()
-    articleURLsVisited = list(visited_urls)
-    tags = TAGS
-
-    for tag in tags:
-        articleURLsQueued = fetch_rss_article_links(tag, articleURLsVisited)
-
-        while articleURLsQueued:
-            articleURL = articleURLsQueued.pop()
+    launch_options = browser_launch_options()
+    browser_manager = BrowserManager(launch_options, MAX_BROWSER_MEMORY_MB, RESTART_BROWSER_EVERY, TAB_POOL_SIZE)
+    try:
+        await browser_manager.start()
+        page = await browser_manager.acquire()
+        startup.mark('launch')
+
+        startup_path = await ensure_logged_in(page)
+        startup.mark(startup_path)
+        startup.report(startup_path)
+        await browser_manager.release(page)
+
+        tags = TAGS
+
+        frontier = ArticleFrontier.load(FRONTIER_FILE_PATH)
+        if not frontier:
+            articles_by_tag = await fetch_all_rss_article_links(tags, visited_urls)
+            # Feeds are newest-first; queue oldest-first like the old per-tag pop()
+            frontier.add_all({tag: list(reversed(links)) for tag, links in articles_by_tag.items()})
+
+        while frontier:
+            article = frontier.peek()
+            articleURL = article['url']
             if articleURL not in visited_urls:
-                await read_and_clap_article(browser, articleURL, visited_urls)
-                await read_and_follow_article(browser, articleURL, visited_urls)
-
-    await browser.close()
+                logging.info(f"Next article (tags: {', '.join(article['tags'])}): {articleURL}")
+                with trace_span('article', STAGE, url=articleURL):
+                    results = await read_article(browser_manager, articleURL, visited_urls)
+                await browser_manager.between_articles()
+                if isinstance(results.get('navigate'), Exception):
+                    with trace_span('persist.frontier'):
+                        frontier.retry(articleURL, MAX_LOAD_ATTEMPTS)
+                    continue
+            with trace_span('persist.frontier'):
+                frontier.done(articleURL)
+    finally:
+        # Runs on errors too: the frontier has already marked these articles done,
+        # so visits still queued for the writer thread must reach disk
+        visited_urls.close()
+        with trace_span('persist.feed_cache'):
+            FEED_CACHE.save()
+        await browser_manager.close()
+        logging.info(tracer().report())
+        tracer().close()
+        if RECORDER is not None:
+            RECORDER.close()
 
 # Handling Event Loop in Windows
-if __name__ == '__main__':
+def run():
+    """Run the bot to completion; also the entry point MediumBotGUI uses to start it in-process."""
     try:
         asyncio.run(main())
     except RuntimeError as e:
@@ -281,3 +421,6 @@ if __name__ == '__main__':
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             loop.run_until_complete(main())
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,36 @@
+"""
+Compare the link-only streaming feed parser with feedparser on the saved feed
+fixtures in benchmarks/fixtures. Run from MediumBotCurrent:
+
+    python benchmarks/bench_feeds.py [--json results.json]
+"""
+
+import glob
+import os
+import feedparser
+
+from harness import FIXTURES_DIR, best_time, run_suite
+from feeds import iter_feed_items, parse_feed_links
+
+FIXTURES = os.path.join(FIXTURES_DIR, 'feed_*.xml')
+NUMBER = 20
+
+
+def run(results, quick=False):
+    number = 2 if quick else NUMBER
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, 'rb') as fixture:
+            body = fixture.read()
+        guids = [guid for _, guid in iter_feed_items(body)]
+        seen = set(guids[1:])  # Only the newest entry is new since the last fetch
+        params = {'fixture': os.path.basename(path), 'kib': round(len(body) / 1024), 'items': len(guids)}
+        feedparser_time = best_time(lambda: [entry.link for entry in feedparser.parse(body).entries], number)
+        results.add('feeds', 'feedparser', feedparser_time, **params)
+        fast_time = best_time(lambda: parse_feed_links(body), number)
+        results.add('feeds', 'streaming_parser', fast_time, speedup=round(feedparser_time / fast_time, 1), **params)
+        early_stop_time = best_time(lambda: parse_feed_links(body, is_seen=seen.__contains__), number)
+        results.add('feeds', 'stop_at_seen', early_stop_time, speedup=round(feedparser_time / early_stop_time, 1), **params)
+
+
+if __name__ == '__main__':
+    run_suite(__doc__, run)
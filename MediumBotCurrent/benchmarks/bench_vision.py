@@ -0,0 +1,167 @@
+"""
+Time the vision hot path (screenshot decode, clap/follow template matching,
+tiled matching and frame fingerprints) on a corpus of article screenshots,
+with no browser. Frames are synthetic article pages drawn at several sizes
+with the buttons planted at known spots. Apart from one pixel-exact reference
+frame, each planted button is resampled and blurred and the frame
+JPEG-compressed, the way real captures differ from the template images, so
+hit= and score= show accuracy changes as well as speed. PNGs saved under
+benchmarks/fixtures/screenshots are added to the corpus when present.
+Run from MediumBotCurrent:
+
+    python benchmarks/bench_vision.py [--json results.json]
+"""
+
+import glob
+import os
+import cv2
+import numpy as np
+
+from harness import FIXTURES_DIR, best_time, run_suite
+from frames import GRAY_INGEST
+from vision import ButtonTemplate, frame_fingerprint, locate_templates, match_template_pyramid, match_template_tiled
+
+SCREENSHOTS = os.path.join(FIXTURES_DIR, 'screenshots', '*.png')
+FRAME_SIZES = [(1366, 768), (1920, 1080), (2732, 1536), (1366, 8000)]  # Viewport, 1080p, 2x-DPR viewport, full page
+QUICK_FRAME_SIZES = [(1366, 768), (1366, 8000)]
+CLAP_ROI = (0.0, 0.5, 1.0, 1.0)
+FOLLOW_ROI = (0.0, 0.0, 1.0, 0.25)
+THRESHOLD = 0.6
+NUMBER = 5
+HIT_TOLERANCE = 4  # Pixels between the match centre and the planted button centre
+# (scale, blur sigma, JPEG quality) for each synthetic frame in turn: the scale
+# stands in for DPR/zoom rendering, the blur for antialiasing and the JPEG for
+# screencast frames. The first frame is pixel-exact, as a reference.
+DISTORTIONS = [
+    (1.0, 0.0, None),
+    (0.92, 0.8, 75),
+    (1.08, 1.0, 60),
+    (0.96, 0.6, 85),
+]
+
+
+# Synthetic Corpus
+def clap_template():
+    image = np.full((48, 48), 255, np.uint8)
+    cv2.circle(image, (24, 24), 20, 90, 2)
+    cv2.ellipse(image, (24, 26), (8, 12), 20, 0, 360, 40, -1)
+    cv2.line(image, (16, 8), (20, 14), 40, 2)
+    cv2.line(image, (30, 8), (27, 14), 40, 2)
+    return ButtonTemplate('clap', 'synthetic', image)
+
+
+def follow_template():
+    image = np.full((36, 80), 255, np.uint8)
+    cv2.rectangle(image, (2, 2), (77, 33), 30, -1)
+    cv2.putText(image, 'Follow', (10, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.55, 255, 1, cv2.LINE_AA)
+    return ButtonTemplate('follow', 'synthetic', image)
+
+
+def distort_button(image, scale, blur):
+    if scale != 1.0:
+        size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+    if blur:
+        image = cv2.GaussianBlur(image, (0, 0), blur)
+    return image
+
+
+def describe(distortion):
+    scale, blur, quality = distortion
+    return 'exact' if distortion == DISTORTIONS[0] else f"x{scale} blur{blur}" + (f" jpeg{quality}" if quality else "")
+
+
+def article_frame(width, height, templates, seed=0, distortion=DISTORTIONS[0]):
+    """
+    A white page with text-like rows and photo-like noise blocks. The follow
+    button sits in the author header and the clap button in the lower half,
+    both passed through distortion. Returns (frame, {template name: planted
+    button centre}).
+    """
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width), 255, np.uint8)
+    margin = width // 5
+    y = 120
+    while y < height - 40:
+        if rng.random() < 0.08:
+            block_h = min(int(rng.integers(200, 500)), height - y - 40)
+            frame[y:y + block_h, margin:width - margin] = rng.integers(0, 256, (block_h, width - 2 * margin), dtype=np.uint8)
+            y += block_h + 40
+            continue
+        line_w = int(rng.integers(width // 3, width - 2 * margin))
+        for x in range(margin, margin + line_w, 9):
+            frame[y:y + 12, x:x + int(rng.integers(3, 8))] = int(rng.integers(20, 90))
+        y += 28
+    scale, blur, quality = distortion
+    planted = {}
+    positions = {'follow': (margin + 160, 60), 'clap': (margin, int(height * 0.8))}
+    for template in templates:
+        x, y = positions[template.name]
+        button = distort_button(template.image, scale, blur)
+        frame[y:y + button.shape[0], x:x + button.shape[1]] = button
+        planted[template.name] = (x + button.shape[1] / 2, y + button.shape[0] / 2)
+    if quality:
+        frame = cv2.imdecode(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_GRAYSCALE)
+    return frame, planted
+
+
+def corpus(templates, sizes):
+    """Yield (label, distortion, frame, planted centres or None) for every synthetic size and saved screenshot."""
+    for index, (width, height) in enumerate(sizes):
+        distortion = DISTORTIONS[index % len(DISTORTIONS)]
+        frame, planted = article_frame(width, height, templates, seed=index, distortion=distortion)
+        yield f'{width}x{height}', describe(distortion), frame, planted
+    for path in sorted(glob.glob(SCREENSHOTS)):
+        frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if frame is not None:
+            yield os.path.basename(path), 'capture', frame, None
+
+
+def hit(location, planted, template):
+    if planted is None or location is None:
+        return None
+    center_x, center_y = template.center(location)
+    planted_x, planted_y = planted[template.name]
+    return abs(center_x - planted_x) <= HIT_TOLERANCE and abs(center_y - planted_y) <= HIT_TOLERANCE
+
+
+def baseline_match(image, template):
+    """The original approach: one cv2.matchTemplate over the whole frame."""
+    result = cv2.matchTemplate(image, template.image, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def run(results, quick=False):
+    number = 1 if quick else NUMBER
+    clap, follow = clap_template(), follow_template()
+    for label, distortion, frame, planted in corpus([clap, follow], QUICK_FRAME_SIZES if quick else FRAME_SIZES):
+        height, width = frame.shape[:2]
+        params = {'frame': label, 'distortion': distortion, 'pixels': width * height}
+        png = cv2.imencode('.png', frame)[1].tobytes()
+        results.add('vision', 'decode_png_gray', best_time(lambda: GRAY_INGEST.decode(png), number), kib=len(png) // 1024, **params)
+        results.add('vision', 'fingerprint', best_time(lambda: frame_fingerprint(frame), number), **params)
+
+        for template, roi in ((clap, CLAP_ROI), (follow, FOLLOW_ROI)):
+            case_params = dict(params, template=template.name)
+            score, location = baseline_match(frame, template)
+            results.add('vision', 'match_full_frame_baseline', best_time(lambda: baseline_match(frame, template), number),
+                        hit=hit(location, planted, template), score=round(score, 3), **case_params)
+            score, location = match_template_pyramid(frame, template)
+            results.add('vision', 'match_pyramid', best_time(lambda: match_template_pyramid(frame, template), number),
+                        hit=hit(location, planted, template), score=round(score, 3), **case_params)
+            score, location = locate_templates(frame, [template], THRESHOLD, roi)[template.name]
+            results.add('vision', 'locate_roi', best_time(lambda: locate_templates(frame, [template], THRESHOLD, roi), number),
+                        hit=hit(location, planted, template), score=round(score, 3), **case_params)
+            if height > 2 * width:
+                score, location = match_template_tiled(frame, template, THRESHOLD)
+                results.add('vision', 'match_tiled', best_time(lambda: match_template_tiled(frame, template, THRESHOLD), number),
+                            hit=hit(location, planted, template), score=round(score, 3), **case_params)
+
+        matches = locate_templates(frame, [clap, follow], THRESHOLD)
+        results.add('vision', 'locate_two_templates', best_time(lambda: locate_templates(frame, [clap, follow], THRESHOLD), number),
+                    hit=None if planted is None else all(hit(matches[template.name][1], planted, template) for template in (clap, follow)), **params)
+
+
+if __name__ == '__main__':
+    run_suite(__doc__, run)
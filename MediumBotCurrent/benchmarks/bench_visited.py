@@ -0,0 +1,92 @@
+"""
+Time the visited store at 1k/100k/1M entries with no network: loading the
+CSV journal, opening and migrating the SQLite index, batched lookups for a
+feed's worth of links, and recording visits. The original full-file rewrite
+of visited_urls.csv on every visit is timed alongside for reference.
+Run from MediumBotCurrent:
+
+    python benchmarks/bench_visited.py [--json results.json]
+"""
+
+import csv
+import os
+import tempfile
+import time
+
+from harness import best_time, run_suite
+from visited import SqliteVisitedIndex, VisitedJournal
+
+SIZES = [1000, 100000, 1000000]
+QUICK_SIZES = [1000, 100000]
+LOOKUP_URLS = 100  # Links in a typical tag feed; half of them already visited
+APPENDS = 1000
+
+
+def article_url(index):
+    return f'https://medium.com/@writer{index % 5000}/a-story-about-number-{index}-{index:012x}?source=rss----{index % 97}'
+
+
+def write_csv(path, size):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        for index in range(size):
+            writer.writerow([article_url(index)])
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def lookup_urls(size):
+    visited = [article_url(index) for index in range(0, size, max(1, size // (LOOKUP_URLS // 2)))][:LOOKUP_URLS // 2]
+    return visited + [article_url(size + index) for index in range(LOOKUP_URLS - len(visited))]
+
+
+def run(results, quick=False):
+    repeat = 1 if quick else 3
+    for size in QUICK_SIZES if quick else SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'visited_urls.csv')
+            write_csv(csv_path, size)
+            urls = lookup_urls(size)
+
+            journal = VisitedJournal(csv_path, 'never')
+            results.add('visited', 'csv_load', best_time(journal.load, repeat=repeat), entries=size)
+            results.add('visited', 'csv_lookup_feed', best_time(lambda: journal.unvisited(urls), 20), entries=size, urls=len(urls))
+            rewrite_time = best_time(lambda: legacy_rewrite(journal.urls, csv_path + '.rewrite'), repeat=repeat)
+            results.add('visited', 'csv_rewrite_legacy_per_visit', rewrite_time, entries=size)
+            new_urls = [article_url(size + LOOKUP_URLS + index) for index in range(APPENDS)]
+            append_time = timed(lambda: append_all(journal, new_urls))
+            results.add('visited', 'csv_append_per_visit', append_time / APPENDS, entries=size, appends=APPENDS)
+
+            db_path = os.path.join(directory, 'visited_urls.db')
+            sqlite_index = SqliteVisitedIndex(db_path)
+            results.add('visited', 'sqlite_migrate_csv', timed(lambda: sqlite_index.migrate_csv(csv_path)), entries=size)
+            sqlite_index.close()
+            results.add('visited', 'sqlite_open', best_time(lambda: SqliteVisitedIndex(db_path).close(), repeat=repeat), entries=size)
+            sqlite_index = SqliteVisitedIndex(db_path)
+            results.add('visited', 'sqlite_lookup_feed', best_time(lambda: sqlite_index.unvisited(urls), 20), entries=size, urls=len(urls))
+            new_urls = [article_url(size + 2 * (LOOKUP_URLS + APPENDS) + index) for index in range(APPENDS)]
+            add_time = timed(lambda: append_all(sqlite_index, new_urls))
+            results.add('visited', 'sqlite_add_per_visit', add_time / APPENDS, entries=size, appends=APPENDS)
+
+
+def append_all(store, urls):
+    """Record every url, then wait for the background writer to commit them."""
+    for url in urls:
+        store.add(url)
+    store.close()
+
+
+def legacy_rewrite(urls, path):
+    """What save_visited_urls used to do after every article: rewrite the whole file."""
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        for url in urls:
+            writer.writerow([url])
+
+
+if __name__ == '__main__':
+    run_suite(__doc__, run)
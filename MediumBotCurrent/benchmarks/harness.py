@@ -0,0 +1,90 @@
+"""
+Shared timing and result recording for the offline benchmarks. Every suite
+adds its measurements to a BenchmarkResults, which prints them as they come
+in and can write them as JSON tagged with the git commit, so runs from
+different commits can be compared with run_all.py --compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+REPEAT = 5
+
+sys.path.insert(0, BOT_DIR)
+
+
+def best_time(func, number=1, repeat=REPEAT):
+    """Best average seconds per call of func over repeat runs of number calls."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def git_commit():
+    """(short commit hash, working tree dirty?) of the bot's repository, or (None, None) outside git."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BOT_DIR, capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+class BenchmarkResults:
+    """Flat list of {suite, case, seconds, params} records plus the run's environment."""
+
+    def __init__(self):
+        self.records = []
+        self.created = time.time()
+
+    def add(self, suite, case, seconds, **params):
+        self.records.append({'suite': suite, 'case': case, 'seconds': seconds, 'params': params})
+        details = ', '.join(f"{key}={value}" for key, value in params.items())
+        print(f"  {suite:<8} {case:<32} {seconds * 1000:10.3f} ms" + (f"  ({details})" if details else ""))
+
+    def to_json(self):
+        commit, dirty = git_commit()
+        return {
+            'commit': commit,
+            'dirty': dirty,
+            'created': self.created,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'results': self.records,
+        }
+
+    def write(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as results_file:
+            json.dump(self.to_json(), results_file, indent=1)
+        os.replace(temp_path, path)
+        print(f"Wrote {len(self.records)} results to {path}")
+
+
+def argument_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON to PATH')
+    parser.add_argument('--quick', action='store_true', help='smaller inputs and fewer repeats, for a fast sanity run')
+    return parser
+
+
+def run_suite(description, run):
+    """Command-line entry point shared by the bench_*.py scripts."""
+    args = argument_parser(description).parse_args()
+    results = BenchmarkResults()
+    run(results, quick=args.quick)
+    if args.json:
+        results.write(args.json)
+    return results
@@ -0,0 +1,75 @@
+"""
+Run every offline benchmark suite and write the results as JSON, by default
+to benchmarks/results/<commit>.json. With --compare, print each case's
+change against an earlier results file and exit non-zero if any case got
+slower than the tolerance or stopped hitting a planted button it used to hit. Run from MediumBotCurrent:
+
+    python benchmarks/run_all.py
+    python benchmarks/run_all.py --compare benchmarks/results/<baseline>.json
+"""
+
+import json
+import os
+import sys
+
+import bench_feeds
+import bench_vision
+import bench_visited
+from harness import RESULTS_DIR, BenchmarkResults, argument_parser, git_commit
+
+SUITES = {
+    'vision': bench_vision.run,
+    'visited': bench_visited.run,
+    'feeds': bench_feeds.run,
+}
+REGRESSION_TOLERANCE = 1.2  # A case this many times slower than the baseline counts as a regression
+
+
+def record_key(record):
+    return record['suite'], record['case'], json.dumps({key: value for key, value in record['params'].items() if key not in ('hit', 'score', 'speedup')}, sort_keys=True)
+
+
+def compare(baseline, current, tolerance=REGRESSION_TOLERANCE):
+    """Print current vs baseline per case and return the keys that regressed, in speed or in hits."""
+    before = {record_key(record): record for record in baseline['results']}
+    regressions = []
+    print(f"Comparing against {baseline.get('commit')} ({len(before)} results)")
+    for record in current['results']:
+        key = record_key(record)
+        if key not in before or not before[key]['seconds']:
+            continue
+        ratio = record['seconds'] / before[key]['seconds']
+        missed = before[key]['params'].get('hit') is True and record['params'].get('hit') is False
+        flag = (' REGRESSION' if ratio > tolerance else '') + (' MISSED' if missed else '')
+        print(f"  {key[0]:<8} {key[1]:<32} {before[key]['seconds'] * 1000:10.3f} -> {record['seconds'] * 1000:10.3f} ms ({ratio:5.2f}x) {key[2]}{flag}")
+        if ratio > tolerance or missed:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--suite', action='append', choices=list(SUITES), help='run only this suite (repeatable)')
+    parser.add_argument('--compare', metavar='BASELINE', help='results JSON from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    results = BenchmarkResults()
+    for name in args.suite or SUITES:
+        print(f"{name}:")
+        SUITES[name](results, quick=args.quick)
+
+    commit, dirty = git_commit()
+    path = args.json or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    results.write(path)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            regressions = compare(json.load(baseline_file), results.to_json(), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {args.tolerance}x the baseline or missing a hit")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
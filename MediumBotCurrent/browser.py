@@ -0,0 +1,213 @@
+import logging
+import os
+import time
+from pyppeteer import launch
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MEDIUM_URL = 'https://medium.com'
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+COOKIE_PARAM_KEYS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires', 'priority')
+
+
+# Session Reuse
+async def medium_session_valid(page, base_url=MEDIUM_URL):
+    """
+    Check the profile's Medium cookies without loading a page: a signed-in
+    session has an unexpired 'sid' cookie and a 'uid' that isn't one of
+    Medium's logged-out 'lo_' placeholders.
+    """
+    cookies = {cookie['name']: cookie for cookie in await page.cookies(base_url)}
+    sid = cookies.get('sid')
+    uid = cookies.get('uid')
+    if sid is None or uid is None or uid['value'].startswith('lo_'):
+        return False
+    expires = sid.get('expires', -1)
+    return expires == -1 or expires > time.time()
+
+
+class StartupTimer:
+    """Measures how long the bot takes from launch until it is ready to read articles."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self, path):
+        steps = ', '.join(f"{name} {elapsed:.1f}s" for name, elapsed in self.marks)
+        logging.info(f"Startup via {path} took {time.perf_counter() - self.started:.1f}s ({steps})")
+
+
+# Browser Memory Sampling
+def _proc_children():
+    """Map of pid -> child pids from /proc, for systems without psutil."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as stat_file:
+                # The command name may contain spaces, so split after its closing parenthesis
+                ppid = int(stat_file.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of pid and all its descendants, or None if it can't be measured."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
+    if not os.path.isdir('/proc'):
+        return None
+    children = _proc_children()
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/statm', 'r') as statm_file:
+                total += int(statm_file.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            pass
+        pending.extend(children.get(current, []))
+    return total
+
+
+# Browser Lifecycle
+class BrowserManager:
+    """
+    Owns the Chromium instance: hands out tabs from a small reusable pool,
+    samples the memory of the browser's process tree between articles, and
+    restarts the browser when the memory or article-count threshold is crossed.
+    Cookies are carried over a restart, so the Medium session survives even
+    without a persistent profile.
+    """
+
+    def __init__(self, launch_options, max_memory_mb=0, restart_every=0, tab_pool_size=1):
+        self.launch_options = launch_options
+        self.max_memory_mb = max_memory_mb
+        self.restart_every = restart_every
+        self.tab_pool_size = tab_pool_size
+        self.browser = None
+        self.restarts = 0
+        self.articles_since_restart = 0
+        self._idle_pages = []
+        self._memory_unmeasurable_warned = False
+
+    async def start(self):
+        self.browser = await launch(**self.launch_options)
+        self.articles_since_restart = 0
+        if self.max_memory_mb and self.memory_mb() is None and not self._memory_unmeasurable_warned:
+            logging.warning(f"Can't measure browser memory here (install psutil); "
+                            f"the {self.max_memory_mb} MB restart threshold is disabled")
+            self._memory_unmeasurable_warned = True
+        return self.browser
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+            self._idle_pages = []
+
+    def memory_mb(self):
+        process = self.browser.process if self.browser is not None else None
+        if process is None:
+            return None
+        rss = process_tree_rss(process.pid)
+        return rss / (1024 * 1024) if rss is not None else None
+
+    async def acquire(self):
+        """Return an idle pooled tab, or open a new one."""
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.isClosed():
+                return page
+        return await self.browser.newPage()
+
+    async def release(self, page):
+        """Blank the tab and keep it for reuse, or close it if the pool is full."""
+        if page.isClosed():
+            return
+        if len(self._idle_pages) >= self.tab_pool_size:
+            await page.close()
+            return
+        try:
+            await page.goto('about:blank')
+            self._idle_pages.append(page)
+        except Exception as e:
+            logging.info(f"Closing tab that could not be reset: {e}")
+            await page.close()
+
+    async def between_articles(self):
+        """Sample memory and restart the browser if a threshold has been crossed."""
+        self.articles_since_restart += 1
+        memory = self.memory_mb()
+        reason = None
+        if self.max_memory_mb and memory is not None and memory > self.max_memory_mb:
+            reason = f"memory {memory:.0f} MB > {self.max_memory_mb} MB"
+        elif self.restart_every and self.articles_since_restart >= self.restart_every:
+            reason = f"{self.articles_since_restart} articles since the last restart"
+        if reason is None:
+            if memory is not None:
+                logging.info(f"Browser memory: {memory:.0f} MB after {self.articles_since_restart} articles")
+            return False
+        await self.restart(reason, memory)
+        return True
+
+    async def restart(self, reason, memory_before=None):
+        cookies = await self._save_cookies()
+        articles = self.articles_since_restart
+        await self.close()
+        await self.start()
+        await self._restore_cookies(cookies)
+        self.restarts += 1
+        memory_after = self.memory_mb()
+        logging.info(f"Restarted browser ({reason}) after {articles} articles: "
+                     f"{_format_mb(memory_before)} before, {_format_mb(memory_after)} after, "
+                     f"{len(cookies)} cookies carried over, restart #{self.restarts}")
+
+    async def _save_cookies(self):
+        try:
+            page = await self.acquire()
+            session = await page.target.createCDPSession()
+            cookies = (await session.send('Network.getAllCookies'))['cookies']
+            await session.detach()
+            await self.release(page)
+            # Session cookies report expires -1, which Network.setCookies would reject
+            return [{key: cookie[key] for key in COOKIE_PARAM_KEYS if key in cookie and not (key == 'expires' and cookie[key] < 0)}
+                    for cookie in cookies]
+        except Exception as e:
+            logging.error(f"Could not save cookies before restarting the browser: {e}")
+            return []
+
+    async def _restore_cookies(self, cookies):
+        if not cookies:
+            return
+        page = await self.acquire()
+        session = await page.target.createCDPSession()
+        await session.send('Network.setCookies', {'cookies': cookies})
+        await session.detach()
+        await self.release(page)
+
+
+def _format_mb(memory):
+    return f"{memory:.0f} MB" if memory is not None else "unknown"
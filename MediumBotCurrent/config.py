@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+
+CONFIG_FILE_PATH = os.environ.get('MEDIUMBOT_CONFIG', 'config.json')
+WINDOWS_CHROMIUM_PATH = r'chrome\win64-125.0.6422.60\chrome-win64\chrome.exe'
+
+# Choices mirrored from frames.FRAME_SOURCES, resources.RESOURCE_PROFILES and
+# MediumBot.STAGES, so the GUI can validate without importing OpenCV or pyppeteer
+FRAME_SOURCE_CHOICES = ('desktop', 'page', 'viewport', 'screencast')
+RESOURCE_PROFILE_CHOICES = ('off', 'lean')
+STAGE_CHOICES = ('clap', 'follow')
+
+
+class ConfigError(ValueError):
+    """Raised with every problem found in a config at once."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__('; '.join(self.problems))
+
+
+# Setting Schema
+class Setting:
+    """One config.json key: its type, default, allowed values and a one-line description."""
+
+    def __init__(self, key, kind, default, help, choices=None, nullable=False, required=False, minimum=None, label=None):
+        self.key = key
+        self.kind = kind  # bool, int, float, str, list (of str) or dict
+        self.default = default
+        self.help = help
+        self.choices = choices  # For lists, the allowed items
+        self.nullable = nullable
+        self.required = required
+        self.minimum = minimum
+        self.label = label or key.replace('_', ' ').title()
+
+    def validate(self, value):
+        """Return value if it fits this setting, else raise ConfigError."""
+        if value is None:
+            if self.nullable:
+                return None
+            raise ConfigError([f"{self.key} must not be null"])
+        if self.kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, self.kind) or (self.kind is int and isinstance(value, bool)):
+            raise ConfigError([f"{self.key} must be {self.kind.__name__}, got {type(value).__name__} {value!r}"])
+        if self.kind is list:
+            bad = [item for item in value if not isinstance(item, str) or (self.choices and item not in self.choices)]
+            if bad:
+                allowed = f" (one of {', '.join(self.choices)})" if self.choices else ''
+                raise ConfigError([f"{self.key} has invalid items {bad}{allowed}"])
+        elif self.choices and value not in self.choices:
+            raise ConfigError([f"{self.key} must be one of {', '.join(self.choices)}, got {value!r}"])
+        if self.minimum is not None and value < self.minimum:
+            raise ConfigError([f"{self.key} must be at least {self.minimum}, got {value}"])
+        return value
+
+    def parse(self, text):
+        """Convert text typed into a form field into a value of this setting's type."""
+        text = text.strip()
+        if text == '' and self.nullable:
+            return None
+        if self.kind is bool:
+            return text.lower() in ('1', 'true', 'yes', 'on')
+        if self.kind is list:
+            return [item.strip() for item in text.split(',') if item.strip()]
+        try:
+            return json.loads(text) if self.kind is dict else self.kind(text)
+        except ValueError:
+            raise ConfigError([f"{self.key} must be {self.kind.__name__}, got {text!r}"])
+
+    def format(self, value):
+        """The text a form field shows for value; the inverse of parse."""
+        if value is None:
+            return ''
+        if self.kind is list:
+            return ', '.join(value)
+        if self.kind is dict:
+            return json.dumps(value)
+        return str(value)
+
+
+SETTINGS = [
+    Setting('EMAIL', str, '', 'Facebook login email', required=True),
+    Setting('PASSWORD', str, '', 'Facebook login password', required=True),
+    Setting('TAGS', list, [], 'Medium tags whose RSS feeds supply the articles', required=True),
+    Setting('ARTICLE_STAGES', list, ['clap', 'follow'], 'Run in order against one page load per article', choices=STAGE_CHOICES),
+    Setting('HEADLESS', bool, False, 'Run Chromium without a window; vision then uses page-level capture only'),
+    Setting('FRAME_SOURCE', str, None, "'desktop', 'page', 'viewport' or 'screencast'; null picks 'viewport' when headless, else 'desktop'",
+            choices=FRAME_SOURCE_CHOICES, nullable=True),
+    Setting('TILED_MATCHING', bool, True, 'Scan long pages one viewport strip at a time'),
+    Setting('VISION_THREADS', int, 2, 'Worker threads for OpenCV work kept off the event loop', minimum=1),
+    Setting('VISITED_STORE', str, 'sqlite', "'sqlite' (migrates visited_urls.csv on first run) or 'csv'", choices=('sqlite', 'csv')),
+    Setting('VISITED_FSYNC', str, 'interval', "'always', 'interval' or 'never'; csv store only", choices=('always', 'interval', 'never')),
+    Setting('BROWSER_PROFILE_DIR', str, 'chrome_profile', 'Keeps cookies and HTTP cache between runs; null for a fresh profile', nullable=True),
+    Setting('MAX_BROWSER_MEMORY_MB', int, 1500, 'Restart Chromium between articles above this; 0 disables', minimum=0),
+    Setting('RESTART_BROWSER_EVERY', int, 0, 'Also restart after this many articles; 0 disables', minimum=0),
+    Setting('TAB_POOL_SIZE', int, 1, 'Idle tabs kept for reuse instead of opening new ones', minimum=0),
+    Setting('RESOURCE_PROFILE', str, 'lean', "'lean' blocks analytics, fonts, images and embeds; 'off' loads everything", choices=RESOURCE_PROFILE_CHOICES),
+    Setting('CHROMIUM_PATH', str, WINDOWS_CHROMIUM_PATH if os.name == 'nt' else None,
+            "Chromium executable; null uses the Chromium pyppeteer downloads for the current platform", nullable=True),
+    Setting('VIEWPORT', dict, None, 'pyppeteer defaultViewport; null uses 1366x900 when headless and the window size otherwise', nullable=True),
+    Setting('TRACE_FILE', str, 'trace.jsonl', 'JSONL span log; null keeps spans in memory for the run report only', nullable=True),
+    Setting('RECORD_DIR', str, None, 'Record frames, DOM snapshots and match scores per article for replay.py; null disables', nullable=True),
+    Setting('MEDIUM_BASE_URL', str, 'https://medium.com', 'e.g. http://127.0.0.1:8765 to run against fixture_server.py'),
+    Setting('LOGIN_URL', str, None, "null: Facebook's OAuth page on medium.com, the fixture's /login.php anywhere else", nullable=True),
+]
+SETTINGS_BY_KEY = {setting.key: setting for setting in SETTINGS}
+
+
+# Typed Config
+class BotConfig:
+    """
+    The bot's settings, validated against SETTINGS once at load. Keys this
+    module doesn't know are kept untouched so a save never drops them.
+    Values are read with config['KEY'] and changed with update(), which
+    validates the whole batch before applying any of it.
+    """
+
+    def __init__(self, values=None, path=CONFIG_FILE_PATH):
+        self.path = path
+        self.values = {setting.key: setting.default for setting in SETTINGS}
+        self.extra = {}
+        if values:
+            self.update(values)
+
+    @classmethod
+    def load(cls, path=CONFIG_FILE_PATH, missing_ok=False):
+        """Read and validate path. With missing_ok, a missing file gives the defaults."""
+        try:
+            with open(path, 'r', encoding='utf-8') as config_file:
+                values = json.load(config_file)
+        except FileNotFoundError:
+            if not missing_ok:
+                raise
+            logging.info(f"{path} not found, starting from the default settings")
+            values = {}
+        except ValueError as e:
+            raise ConfigError([f"{path} is not valid JSON: {e}"])
+        if not isinstance(values, dict):
+            raise ConfigError([f"{path} must hold a JSON object"])
+        return cls(values, path)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def get(self, key, default=None):
+        return self.values.get(key, self.extra.get(key, default))
+
+    def update(self, values):
+        """Validate every known key in values, then apply them all, or raise ConfigError listing each problem."""
+        validated = {}
+        problems = []
+        for key, value in values.items():
+            setting = SETTINGS_BY_KEY.get(key)
+            if setting is None:
+                continue
+            try:
+                validated[key] = setting.validate(value)
+            except ConfigError as e:
+                problems.extend(e.problems)
+        if problems:
+            raise ConfigError(problems)
+        self.values.update(validated)
+        self.extra.update({key: value for key, value in values.items() if key not in SETTINGS_BY_KEY})
+        return self
+
+    def check_required(self):
+        """Raise ConfigError if a setting the bot cannot run without is empty."""
+        missing = [setting.key for setting in SETTINGS if setting.required and not self.values[setting.key]]
+        if missing:
+            raise ConfigError([f"{key} is required" for key in missing])
+        return self
+
+    def to_dict(self):
+        data = dict(self.extra)
+        data.update(self.values)
+        return data
+
+    def save(self, path=None):
+        """Write every setting in one pass, atomically."""
+        path = path or self.path
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as config_file:
+            json.dump(self.to_dict(), config_file, indent=4)
+        os.replace(temp_path, path)
+        self.path = path
+        return path
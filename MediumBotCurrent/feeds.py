@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+import feedparser
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from tracing import trace_span
+
+# Feed Settings
+MEDIUM_FEED_URL = 'https://medium.com/feed/tag/{tag}'
+FEED_TIMEOUT = 20  # Seconds per feed request
+FEED_CONCURRENCY = 4  # Feeds in flight at once, and keep-alive connections kept in the pool
+GUID_PATTERN = re.compile(rb'<guid[^>]*>\s*(.*?)\s*</guid>', re.S)
+PARSE_CHUNK_SIZE = 16384  # Bytes fed to the pull parser at a time
+
+
+def tag_slug(tag):
+    return tag.replace(" ", "-").lower()
+
+
+def feed_url(tag, base_url=MEDIUM_FEED_URL):
+    return base_url.format(tag=tag_slug(tag))
+
+
+# Link-Only Feed Parsing
+def iter_feed_items(chunks):
+    """
+    Incrementally parse RSS bytes (one bytes object or an iterable of chunks)
+    and yield (link, guid) per <item> as soon as it closes, discarding each item
+    afterwards. Raises ET.ParseError on malformed XML.
+    """
+    if isinstance(chunks, bytes):
+        body = chunks
+        chunks = (body[start:start + PARSE_CHUNK_SIZE] for start in range(0, len(body), PARSE_CHUNK_SIZE))
+    parser = ET.XMLPullParser(events=('end',))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if element.tag == 'item':
+                link = (element.findtext('link') or '').strip()
+                guid = (element.findtext('guid') or link).strip()
+                element.clear()
+                yield link, guid
+    parser.close()
+
+
+def parse_feed_links(body, is_seen=None):
+    """
+    Return the item links of a feed, newest first. With is_seen, stop at the
+    first item whose GUID this feed already returned on an earlier fetch, since
+    Medium feeds are ordered newest-first. Falls back to feedparser when the
+    XML is malformed.
+    """
+    links = []
+    try:
+        for link, guid in iter_feed_items(body):
+            if is_seen is not None and is_seen(guid):
+                logging.info(f"Reached previously fetched entry {guid}, skipping the rest of the feed")
+                return links
+            if link:
+                links.append(link)
+        return links
+    except ET.ParseError as e:
+        logging.info(f"Fast feed parser failed ({e}), falling back to feedparser")
+    feed = feedparser.parse(body)
+    if feed.bozo and not feed.entries:
+        return None
+    links = []
+    for entry in feed.entries:
+        link = entry.get('link')
+        if is_seen is not None and is_seen(entry.get('id', link)):
+            break
+        if link:
+            links.append(link)
+    return links
+
+
+# Conditional-GET Feed Cache
+class FeedCache:
+    """
+    Remembers ETag/Last-Modified and the last parsed entry IDs and links per
+    tag. Requests are sent conditionally; a 304, or a 200 whose <guid> set
+    matches the cached one, returns the cached links without running
+    feedparser at all. A changed feed is parsed only down to the newest entry
+    it held last time. The early stop uses this tag's own cached IDs, not the
+    global visited set. Tags overlap, so a post visited through another tag
+    must not hide older entries of this one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = {'not_modified': 0, 'unchanged': 0, 'parsed': 0, 'errors': 0}
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as cache_file:
+                self.entries = json.load(cache_file)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logging.error(f"Ignoring unreadable feed cache {self.path}: {e}")
+
+    def request_headers(self, tag):
+        """Conditional request headers for tag's feed."""
+        cached = self.entries.get(tag_slug(tag), {})
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('modified'):
+            headers['If-Modified-Since'] = cached['modified']
+        return headers
+
+    def resolve(self, tag, status, headers, body):
+        """Turn an HTTP response for tag's feed into its list of article links."""
+        cached = self.entries.get(tag_slug(tag))
+        if status == 304:
+            if cached is None:
+                self.stats['errors'] += 1
+                logging.error(f"Feed for {tag} answered 304 but nothing is cached for it")
+                return []
+            self.stats['not_modified'] += 1
+            logging.info(f"Feed for {tag} not modified, using {len(cached['links'])} cached links")
+            return list(cached['links'])
+
+        guids = [guid.decode('utf-8', 'replace') for guid in GUID_PATTERN.findall(body or b'')]
+        if cached is not None and guids and guids == cached.get('ids'):
+            self.stats['unchanged'] += 1
+            logging.info(f"Feed for {tag} has the same {len(guids)} entries, skipping parse")
+            links = list(cached['links'])
+        else:
+            links = self.parse(tag, body, set(cached.get('ids', [])) if cached is not None else None)
+            if links is None:
+                return []
+            self.stats['parsed'] += 1
+
+        self.entries[tag_slug(tag)] = {
+            'etag': headers.get('ETag'),
+            'modified': headers.get('Last-Modified'),
+            'ids': guids,
+            'links': links,
+        }
+        return links
+
+    def parse(self, tag, body, seen_ids=None):
+        links = parse_feed_links(body, seen_ids.__contains__ if seen_ids else None)
+        if links is None:
+            self.stats['errors'] += 1
+            logging.error(f'No entries found in the RSS feed for tag: {tag}')
+        return links
+
+    def hit_rate(self):
+        hits = self.stats['not_modified'] + self.stats['unchanged']
+        total = hits + self.stats['parsed']
+        return hits / total if total else 0.0
+
+    def save(self):
+        """Write the cache atomically."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(self.entries, cache_file)
+        os.replace(temp_path, self.path)
+        logging.info(f"Feed cache: {self.stats} (hit rate {self.hit_rate():.0%})")
+
+
+# Concurrent Feed Fetching
+async def fetch_all_feed_links(tags, cache, base_url=MEDIUM_FEED_URL, concurrency=FEED_CONCURRENCY, timeout=FEED_TIMEOUT):
+    """
+    Fetch every tag's feed at once over one keep-alive connection pool, at most
+    concurrency requests in flight, each bounded by timeout. urllib3 (already
+    installed with pyppeteer) does the blocking I/O on worker threads, so the
+    event loop stays free. Returns {tag: links} in tag order; failed feeds map
+    to an empty list.
+    """
+    loop = asyncio.get_running_loop()
+    pool = urllib3.PoolManager(maxsize=concurrency, retries=False, timeout=urllib3.Timeout(total=timeout))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(executor, tag):
+        async with semaphore:
+            url = feed_url(tag, base_url)
+            try:
+                with trace_span('feed.fetch', tag=tag) as span:
+                    response = await asyncio.wait_for(
+                        loop.run_in_executor(executor, functools.partial(pool.request, 'GET', url, headers=cache.request_headers(tag))),
+                        timeout)
+                    span['status'] = response.status
+            except (asyncio.TimeoutError, urllib3.exceptions.HTTPError, OSError) as e:
+                cache.stats['errors'] += 1
+                logging.error(f"Error fetching feed for tag {tag}: {e!r}")
+                return []
+            if response.status not in (200, 304):
+                cache.stats['errors'] += 1
+                logging.error(f"Error fetching feed for tag {tag}: HTTP {response.status}")
+                return []
+            with trace_span('feed.parse', tag=tag, bytes=len(response.data or b'')):
+                return await loop.run_in_executor(executor, cache.resolve, tag, response.status, response.headers, response.data)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='feeds') as executor:
+        try:
+            results = await asyncio.gather(*(fetch(executor, tag) for tag in tags))
+        finally:
+            pool.clear()
+    return dict(zip(tags, results))
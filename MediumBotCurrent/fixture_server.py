@@ -0,0 +1,344 @@
+"""
+Local stand-in for the parts of Medium the bot talks to, so the whole
+pipeline can be run, load-tested and profiled offline:
+
+    /feed/tag/<tag>             RSS 2.0 tag feeds (with ETag / 304 support)
+    /@<author>/<title>-<id>     article pages with clap and follow buttons
+    /login.php                  a fake Facebook login form
+    /m/callback/v2/facebook     the login callback, which sets Medium-style sid/uid cookies
+    /_/api/clap|follow/<id>     where the buttons report clicks
+    /_/stats                    JSON counters (requests, claps, follows, logins)
+
+Everything is generated deterministically from a seed. Start it with
+
+    python fixture_server.py --port 8765
+
+and set "MEDIUM_BASE_URL": "http://127.0.0.1:8765" in config.json.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import random
+import struct
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Fixture Settings
+DEFAULT_PORT = 8765
+ARTICLE_POOL_SIZE = 200  # Articles shared by every tag feed, so tags overlap like they do on Medium
+ARTICLES_PER_TAG = 10  # Medium's tag feeds carry the latest 10 posts
+AUTHORS = 40
+WORDS_PER_ARTICLE = (600, 3000)  # Roughly a 2 to 12 minute read
+IMAGES_PER_ARTICLE = (0, 6)
+SESSION_DAYS = 30
+
+WORDS = ('data', 'python', 'model', 'system', 'performance', 'design', 'cloud', 'user', 'code', 'team', 'network',
+         'latency', 'cache', 'query', 'future', 'learning', 'product', 'simple', 'scale', 'story', 'every', 'build',
+         'because', 'should', 'would', 'better', 'without', 'across', 'through', 'often', 'really', 'thing', 'the',
+         'a', 'of', 'to', 'and', 'in', 'is', 'that', 'it', 'for', 'on', 'with', 'as', 'we', 'you', 'this', 'can')
+
+CLAP_SVG = ('<svg width="24" height="24" viewBox="0 0 24 24" aria-label="clap"><path fill-rule="evenodd" '
+            'd="M11.37.83L12 3.28l.63-2.45h-1.26zM13.92 3.95l1.52-2.1-1.18-.4-.34 2.5zM8.59 1.84l1.52 2.11-.34-2.5-1.18.4zM18.52 '
+            '18.92a4.23 4.23 0 0 1-2.62 1.33l.41-.37c2.39-2.4 2.86-4.95 1.4-7.63l-.91-1.6-.8-1.67c-.25-.56-.19-.98.21-1.29a.7.7 0 0 1 '
+            '.55-.13c.28.05.54.23.72.5l2.37 4.16c.97 1.62 1.14 4.23-1.33 6.7zm-11-.44l-4.15-4.15a.83.83 0 0 1 1.17-1.17l2.16 2.16a.37.37 '
+            '0 0 0 .51-.52l-2.15-2.16L3.6 11.2a.83.83 0 0 1 1.17-1.17l3.43 3.44a.36.36 0 0 0 .52 0 .36.36 0 0 0 0-.52L5.29 9.51l-.97-.97a.83.83 '
+            '0 0 1 0-1.16.84.84 0 0 1 1.17 0l.97.97 3.44 3.43a.36.36 0 0 0 .51 0 .37.37 0 0 0 0-.52L6.98 7.83a.82.82 0 0 1-.18-.9.82.82 0 '
+            '0 1 .76-.51c.22 0 .43.09.58.24l5.8 5.79a.37.37 0 0 0 .58-.42L13.4 9.67c-.26-.56-.2-.98.2-1.29a.7.7 0 0 1 .55-.13c.28.05.55.23.73.5l2.2 '
+            '3.86c1.3 2.38.87 4.59-1.29 6.75a4.65 4.65 0 0 1-4.19 1.37 7.73 7.73 0 0 1-4.07-2.25z"></path></svg>')
+
+PAGE_STYLE = '''
+body { margin: 0; font-family: Georgia, serif; color: #242424; background: #fff; }
+header.site { height: 57px; border-bottom: 1px solid #f2f2f2; display: flex; align-items: center; padding: 0 24px; font: bold 24px sans-serif; }
+article { max-width: 680px; margin: 0 auto; padding: 40px 24px 120px; }
+h1 { font: bold 42px/52px sans-serif; margin: 0 0 32px; }
+p { font-size: 20px; line-height: 32px; margin: 0 0 30px; }
+figure { margin: 40px 0; } figure img { width: 100%; height: 380px; background: #eee; display: block; }
+.byline { display: flex; align-items: center; gap: 12px; margin-bottom: 32px; font: 14px sans-serif; }
+.avatar { width: 44px; height: 44px; border-radius: 50%; background: #ccc; }
+button { cursor: pointer; }
+button.follow { background: #191919; color: #fff; border: 1px solid #191919; border-radius: 99em; padding: 6px 16px; font: 14px sans-serif; }
+button.follow.following { background: #fff; color: #191919; }
+.clapbar { display: flex; align-items: center; gap: 8px; padding: 12px 0; border-top: 1px solid #f2f2f2; border-bottom: 1px solid #f2f2f2; margin: 0 0 32px; font: 14px sans-serif; color: #6b6b6b; }
+.clapbar button { background: none; border: none; padding: 4px; fill: #6b6b6b; }
+.clapbar button.clapped { fill: #191919; }
+'''
+
+CLICK_SCRIPT = '''
+const report = (what, el) => { navigator.sendBeacon('/_/api/' + what + '/' + document.body.dataset.postId); return el; };
+document.querySelectorAll('[data-testid$="ClapButton"]').forEach(el => el.addEventListener('click', () => {
+    report('clap', el); document.querySelectorAll('.clap-count').forEach(c => c.textContent = String(Number(c.textContent) + 1));
+    document.querySelectorAll('[data-testid$="ClapButton"]').forEach(b => b.classList.add('clapped'));
+}));
+document.querySelectorAll('button.follow').forEach(el => el.addEventListener('click', () => {
+    report('follow', el); el.textContent = 'Following'; el.classList.add('following');
+}));
+'''
+
+
+def placeholder_png(gray=230):
+    """A 1x1 gray PNG; CSS stretches it to the figure size."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(bytes([0, gray]))) + chunk(b'IEND', b''))
+
+
+PLACEHOLDER_PNG = placeholder_png()
+
+
+# Fixture Content
+class FixtureArticle:
+    """One generated post; everything about it is derived from its index and the site seed."""
+
+    def __init__(self, index, seed):
+        rng = random.Random(f'{seed}:article:{index}')
+        self.index = index
+        self.post_id = hashlib.sha1(f'{seed}:{index}'.encode()).hexdigest()[:12]
+        self.author = f'writer{index % AUTHORS}'
+        self.title = ' '.join(rng.choice(WORDS[:32]) for _ in range(rng.randint(4, 9))).capitalize()
+        self.slug = '-'.join(self.title.lower().split())
+        self.words = rng.randint(*WORDS_PER_ARTICLE)
+        self.images = rng.randint(*IMAGES_PER_ARTICLE)
+        self.published = time.time() - index * 3600
+        self.seed = f'{seed}:body:{index}'
+
+    def path(self):
+        return f'/@{self.author}/{self.slug}-{self.post_id}'
+
+    def paragraphs(self):
+        rng = random.Random(self.seed)
+        remaining = self.words
+        while remaining > 0:
+            count = min(remaining, rng.randint(40, 120))
+            remaining -= count
+            yield ' '.join(rng.choice(WORDS) for _ in range(count)).capitalize() + '.'
+
+
+class FixtureSite:
+    """The generated article pool plus the counters the request handler updates."""
+
+    def __init__(self, seed=0, pool_size=ARTICLE_POOL_SIZE, per_tag=ARTICLES_PER_TAG):
+        self.seed = seed
+        self.per_tag = per_tag
+        self.articles = [FixtureArticle(index, seed) for index in range(pool_size)]
+        self.by_id = {article.post_id: article for article in self.articles}
+        self.stats = {'requests': {}, 'claps': {}, 'follows': {}, 'logins': 0}
+        self._lock = threading.Lock()
+
+    def count(self, key, name=None):
+        with self._lock:
+            if name is None:
+                self.stats[key] += 1
+            else:
+                self.stats[key][name] = self.stats[key].get(name, 0) + 1
+
+    def tag_articles(self, tag):
+        """The newest-first articles of a tag: a fixed sample of the shared pool."""
+        rng = random.Random(f'{self.seed}:tag:{tag}')
+        sample = rng.sample(self.articles, min(self.per_tag, len(self.articles)))
+        return sorted(sample, key=lambda article: article.index)
+
+    def feed(self, base_url, tag):
+        items = []
+        for article in self.tag_articles(tag):
+            url = f'{base_url}{article.path()}'
+            teaser = ''.join(f'<p>{paragraph}</p>' for paragraph, _ in zip(article.paragraphs(), range(6)))
+            items.append(
+                f'<item><title><![CDATA[{article.title}]]></title><link>{url}?source=rss----{tag}---4</link>'
+                f'<guid isPermaLink="false">{base_url}/p/{article.post_id}</guid><category><![CDATA[{tag}]]></category>'
+                f'<dc:creator><![CDATA[{article.author}]]></dc:creator><pubDate>{formatdate(article.published, usegmt=True)}</pubDate>'
+                f'<atom:updated>{time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(article.published))}</atom:updated>'
+                f'<content:encoded><![CDATA[<h3>{article.title}</h3>{teaser}]]></content:encoded></item>')
+        return ('<?xml version="1.0" encoding="UTF-8"?><rss xmlns:dc="http://purl.org/dc/elements/1.1/" '
+                'xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:atom="http://www.w3.org/2005/Atom" version="2.0">'
+                f'<channel><title><![CDATA[{tag} on Medium]]></title><link>{base_url}/tag/{tag}/latest</link>'
+                f'<generator>Medium fixture server</generator>{"".join(items)}</channel></rss>').encode('utf-8')
+
+    def article_page(self, article):
+        body = []
+        images = set(random.Random(article.seed).sample(range(40), article.images)) if article.images else set()
+        for number, paragraph in enumerate(article.paragraphs()):
+            body.append(f'<p>{html.escape(paragraph)}</p>')
+            if number in images:
+                body.append(f'<figure><img src="/_/image/{article.post_id}-{number}.png" alt=""></figure>')
+        clap_bar = lambda where: (
+            f'<div class="clapbar"><button data-testid="{where}ClapButton" aria-label="clap">{CLAP_SVG}</button>'
+            f'<span class="clap-count">{self.stats["claps"].get(article.post_id, 0)}</span></div>')
+        return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(article.title)} | by {article.author} | Medium</title>'
+                f'<style>{PAGE_STYLE}</style></head><body data-post-id="{article.post_id}"><header class="site">Medium</header>'
+                f'<article><h1>{html.escape(article.title)}</h1><div class="byline"><div class="avatar"></div>'
+                f'<a href="/@{article.author}">{article.author}</a>'
+                f'<button class="follow" data-testid="headerFollowButton">Follow</button>'
+                f'<span>{max(1, article.words // 238)} min read</span></div>{clap_bar("header")}'
+                f'{"".join(body)}{clap_bar("footer")}</article><script>{CLICK_SCRIPT}</script></body></html>').encode('utf-8')
+
+
+LOGIN_PAGE = b'''<!DOCTYPE html><html><head><meta charset="utf-8"><title>Log in to Facebook</title></head><body>
+<form method="post" action="/m/callback/v2/facebook">
+<input type="text" id="email" name="email" autocomplete="off"><input type="password" id="pass" name="pass">
+<button type="submit" id="loginbutton" name="login">Log in</button></form></body></html>'''
+
+
+# Request Handling
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'MediumFixture/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def site(self):
+        return self.server.site
+
+    def log_message(self, format, *args):
+        logging.debug(f"Fixture server: {format % args}")
+
+    def base_url(self):
+        return f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address[:2])}"
+
+    def send(self, status, body=b'', content_type='text/html; charset=utf-8', headers=None):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD' and status != 304:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith('/feed/tag/'):
+            self.site.count('requests', 'feed')
+            self.feed(path[len('/feed/tag/'):])
+        elif path.startswith('/@') and path.count('/') == 2:
+            self.site.count('requests', 'article')
+            self.article(path.rsplit('-', 1)[-1])
+        elif path.startswith('/p/'):
+            self.site.count('requests', 'article')
+            self.article(path[len('/p/'):])
+        elif path.startswith('/_/image/'):
+            self.site.count('requests', 'image')
+            self.send(200, PLACEHOLDER_PNG, 'image/png', {'Cache-Control': 'max-age=86400'})
+        elif path == '/login.php':
+            self.site.count('requests', 'login')
+            self.send(200, LOGIN_PAGE)
+        elif path == '/_/stats':
+            self.send(200, json.dumps(self.site.stats).encode('utf-8'), 'application/json')
+        elif path in ('/', '') or path.startswith('/@'):
+            self.site.count('requests', 'home')
+            links = ''.join(f'<li><a href="{article.path()}">{html.escape(article.title)}</a></li>' for article in self.site.articles[:20])
+            self.send(200, f'<!DOCTYPE html><html><body><header class="site">Medium</header><ul>{links}</ul></body></html>'.encode('utf-8'))
+        else:
+            self.site.count('requests', 'not_found')
+            self.send(404, b'Not found', 'text/plain')
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8', 'replace')) if length else {}
+        if path == '/m/callback/v2/facebook':
+            self.site.count('requests', 'login_callback')
+            self.login(form)
+        elif path.startswith('/_/api/clap/'):
+            self.site.count('claps', path.rsplit('/', 1)[-1])
+            self.send(200, b'{}', 'application/json')
+        elif path.startswith('/_/api/follow/'):
+            self.site.count('follows', path.rsplit('/', 1)[-1])
+            self.send(200, b'{}', 'application/json')
+        else:
+            self.send(404, b'Not found', 'text/plain')
+
+    def feed(self, tag):
+        body = self.site.feed(self.base_url(), tag.lower())
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        headers = {'ETag': etag, 'Last-Modified': formatdate(self.site.articles[0].published, usegmt=True)}
+        if self.headers.get('If-None-Match') == etag:
+            self.send(304, headers=headers)
+        else:
+            self.send(200, body, 'text/xml; charset=UTF-8', headers)
+
+    def article(self, post_id):
+        article = self.site.by_id.get(post_id)
+        if article is None:
+            self.send(404, b'Not found', 'text/plain')
+        else:
+            self.send(200, self.site.article_page(article))
+
+    def login(self, form):
+        self.site.count('logins')
+        email = form.get('email', ['reader@example.com'])[0]
+        uid = hashlib.sha1(email.encode()).hexdigest()[:12]
+        expires = formatdate(time.time() + SESSION_DAYS * 86400, usegmt=True)
+        self.send_response(302)
+        self.send_header('Location', '/')
+        self.send_header('Set-Cookie', f'sid=1:{hashlib.sha1(uid.encode()).hexdigest()}; Path=/; Expires={expires}; HttpOnly')
+        self.send_header('Set-Cookie', f'uid={uid}; Path=/; Expires={expires}')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Serves a FixtureSite; start() runs it on a daemon thread for in-process use."""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, site=None, latency=0.0):
+        super().__init__((host, port), FixtureRequestHandler)
+        self.site = site or FixtureSite()
+        self.latency = latency  # Seconds added to every response, to mimic a real network
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--seed', type=int, default=0, help='changes every generated article and feed')
+    parser.add_argument('--articles', type=int, default=ARTICLE_POOL_SIZE, help='size of the article pool shared by all tags')
+    parser.add_argument('--per-tag', type=int, default=ARTICLES_PER_TAG, help='items in each tag feed')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of delay added to every response')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = FixtureServer(args.host, args.port, FixtureSite(args.seed, args.articles, args.per_tag), args.latency)
+    logging.info(f'Serving the Medium fixture site on {server.base_url}; set "MEDIUM_BASE_URL": "{server.base_url}" in config.json')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logging.info(f"Fixture server stats: {json.dumps(server.site.stats)}")
+
+
+if __name__ == '__main__':
+    main()
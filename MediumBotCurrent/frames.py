@@ -0,0 +1,244 @@
+import asyncio
+import base64
+import logging
+import time
+import cv2
+import numpy as np
+from collections import deque
+from PIL import ImageGrab
+from recorder import record_detection
+from tracing import record_score, trace_span
+from vision import match_templates, run_vision, strip_offsets
+
+# Frame Source Settings
+SCREENCAST_BUFFER_SIZE = 8  # Recent viewport frames kept in the ring buffer
+SCREENCAST_FIRST_FRAME_TIMEOUT = 5  # Seconds to wait for Chrome's first frame
+SCREENCAST_FORMAT = 'png'  # 'jpeg' is cheaper to encode but lossy around the button edges
+
+
+# Grayscale Ingest
+class GrayscaleIngest:
+    """
+    Turns captures into single-channel uint8 frames for the matcher. Encoded
+    bytes are decoded straight to grayscale, and desktop grabs are converted
+    into a buffer that is reused while the capture size stays the same, so
+    the returned array is only valid until the next call.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def _buffer(self, shape):
+        if shape not in self._buffers:
+            self._buffers[shape] = np.empty(shape, dtype=np.uint8)
+        return self._buffers[shape]
+
+    def decode(self, data):
+        """Decode PNG/JPEG bytes to grayscale without an intermediate RGBA copy."""
+        with trace_span('decode', bytes=len(data)):
+            gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError(f"Could not decode {len(data)} bytes of screenshot data")
+        return gray
+
+    def from_pil(self, image):
+        """Convert a PIL capture to grayscale into a preallocated buffer."""
+        with trace_span('decode'):
+            pixels = np.asarray(image)
+            if pixels.ndim == 2:
+                return pixels
+            return cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY, dst=self._buffer(pixels.shape[:2]))
+
+
+GRAY_INGEST = GrayscaleIngest()
+
+
+# Desktop Capture
+class DesktopFrameSource:
+    """Grabs the whole desktop with PIL.ImageGrab on every call."""
+
+    name = 'desktop'
+
+    def __init__(self, ingest=GRAY_INGEST):
+        self.ingest = ingest
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def grab(self):
+        return await run_vision(self._grab)
+
+    def _grab(self):
+        with trace_span('capture', source=self.name):
+            image = ImageGrab.grab()
+        return self.ingest.from_pil(image)
+
+    def to_page_coords(self, x, y):
+        return x, y
+
+
+# Page Screenshot Capture
+async def device_pixel_ratio(page):
+    return await page.evaluate('window.devicePixelRatio') or 1
+
+
+class PageScreenshotFrameSource:
+    """Asks pyppeteer for an encoded full-page (or viewport) screenshot on every call."""
+
+    name = 'page'
+
+    def __init__(self, page, full_page=True, ingest=GRAY_INGEST):
+        self.page = page
+        self.full_page = full_page
+        self.ingest = ingest
+        self.device_pixel_ratio = 1
+
+    async def start(self):
+        self.device_pixel_ratio = await device_pixel_ratio(self.page)
+
+    async def stop(self):
+        pass
+
+    async def grab(self):
+        with trace_span('capture', source=self.name, full_page=self.full_page):
+            screenshot = await self.page.screenshot(fullPage=self.full_page)
+        return await run_vision(self.ingest.decode, screenshot)
+
+    def to_page_coords(self, x, y):
+        """Screenshots are in device pixels; mouse clicks are in CSS pixels."""
+        return int(x / self.device_pixel_ratio), int(y / self.device_pixel_ratio)
+
+
+# CDP Screencast Capture
+class ScreencastFrame:
+    """One encoded frame pushed by Page.screencastFrame, decoded on demand."""
+
+    def __init__(self, data, metadata):
+        self.data = data
+        self.metadata = metadata
+        self.received_at = time.monotonic()
+        self._gray = None
+
+    def gray(self):
+        if self._gray is None:
+            self._gray = GRAY_INGEST.decode(self.data)
+        return self._gray
+
+
+class ScreencastFrameSource:
+    """
+    Keeps a bounded ring buffer of viewport frames streamed by Chrome DevTools
+    Page.startScreencast, so detectors read the latest frame without a capture
+    round trip.
+    """
+
+    name = 'screencast'
+
+    def __init__(self, page, buffer_size=SCREENCAST_BUFFER_SIZE, image_format=SCREENCAST_FORMAT):
+        self.page = page
+        self.image_format = image_format
+        self.frames = deque(maxlen=buffer_size)
+        self.frames_received = 0
+        self._client = None
+        self._grabbed = None
+        self._frame_event = asyncio.Event()
+
+    async def start(self):
+        self._client = await self.page.target.createCDPSession()
+        self._client.on('Page.screencastFrame', self._on_frame)
+        await self._client.send('Page.startScreencast', {'format': self.image_format, 'everyNthFrame': 1})
+        logging.info(f"Started {self.image_format} screencast with a {self.frames.maxlen}-frame buffer")
+
+    async def stop(self):
+        if self._client is None:
+            return
+        try:
+            await self._client.send('Page.stopScreencast')
+            await self._client.detach()
+        except Exception as e:
+            logging.info(f"Screencast already stopped: {e}")
+        self._client = None
+        logging.info(f"Stopped screencast after {self.frames_received} frames")
+
+    def _on_frame(self, params):
+        self.frames.append(ScreencastFrame(base64.b64decode(params['data']), params['metadata']))
+        self.frames_received += 1
+        self._frame_event.set()
+        # Chrome stops sending frames until the previous one is acknowledged
+        asyncio.ensure_future(self._client.send('Page.screencastFrameAck', {'sessionId': params['sessionId']}))
+
+    def latest(self):
+        return self.frames[-1] if self.frames else None
+
+    async def grab(self):
+        with trace_span('capture', source=self.name):
+            if not self.frames:
+                await asyncio.wait_for(self._frame_event.wait(), SCREENCAST_FIRST_FRAME_TIMEOUT)
+            self._grabbed = self.latest()
+        return await run_vision(self._grabbed.gray)
+
+    def to_page_coords(self, x, y):
+        """Map pixels of the last grabbed frame to CSS pixels using its deviceWidth/deviceHeight metadata."""
+        frame = self._grabbed
+        if frame is None:
+            return x, y
+        height, width = frame.gray().shape[:2]
+        scale_x = frame.metadata.get('deviceWidth', width) / width
+        scale_y = frame.metadata.get('deviceHeight', height) / height
+        return int(x * scale_x), int(y * scale_y)
+
+
+FRAME_SOURCES = {
+    'desktop': lambda page: DesktopFrameSource(),
+    'page': lambda page: PageScreenshotFrameSource(page),
+    'viewport': lambda page: PageScreenshotFrameSource(page, full_page=False),
+    'screencast': lambda page: ScreencastFrameSource(page),
+}
+
+
+def make_frame_source(name, page):
+    """Build a frame source by name: 'desktop', 'page', 'viewport' or 'screencast'."""
+    if name not in FRAME_SOURCES:
+        raise ValueError(f"Unknown frame source: {name}. Expected one of {', '.join(FRAME_SOURCES)}")
+    return FRAME_SOURCES[name](page)
+
+
+# Per-Viewport Strip Matching
+def _match_strip(ingest, screenshot, templates, threshold, scroll_y):
+    image = ingest.decode(screenshot)
+    started = time.perf_counter()
+    matches = match_templates(image, templates)
+    record_detection('strip', image, templates, None, threshold, matches, time.perf_counter() - started, scroll_y=scroll_y)
+    return matches
+
+
+async def match_page_strips(page, templates, threshold, ingest=GRAY_INGEST):
+    """
+    Scroll through the page one viewport at a time, matching each template on
+    the visible strip only, so memory is bounded by the viewport rather than
+    the article length. Stops at the first strip where a template clears the
+    threshold. Returns (max_val, centre, template) for the best match seen,
+    with the centre in CSS page coordinates.
+    """
+    metrics = await page.evaluate('({height: document.documentElement.scrollHeight, viewport: window.innerHeight, ratio: window.devicePixelRatio || 1})')
+    ratio = metrics['ratio']
+    overlap = int(max(template.h for template in templates) / ratio) + 1
+    best_val, best_loc, best_template = -1.0, None, None
+    for top in strip_offsets(metrics['height'], metrics['viewport'], overlap):
+        scroll_y = await page.evaluate(f'window.scrollTo(0, {top}); window.scrollY')
+        with trace_span('capture', source='strip'):
+            screenshot = await page.screenshot()
+        matches = await run_vision(_match_strip, ingest, screenshot, templates, threshold, scroll_y)
+        for template in templates:
+            max_val, max_loc = matches[template.name]
+            if max_loc is not None and max_val > best_val:
+                center_x, center_y = template.center(max_loc)
+                best_val, best_loc, best_template = max_val, (int(center_x / ratio), int(center_y / ratio) + scroll_y), template
+        if best_val >= threshold:
+            break
+    if best_template is not None:
+        record_score(best_template.name, best_val)
+    return best_val, best_loc, best_template
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+from visited import canonical_article_id
+
+
+class ArticleFrontier:
+    """
+    One queue of articles shared by every tag, keyed by canonical article ID so
+    an article surfaced by several tags is queued once and remembers each tag.
+    The queue is checkpointed to a small JSON file whenever it changes, so a
+    restart resumes from it instead of re-fetching every feed. An article that
+    fails to load goes to the back of the queue with its attempts counted,
+    rather than being dropped: its feed would not offer it again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.articles = OrderedDict()  # article_id -> {'url': ..., 'tags': [...]}
+
+    @classmethod
+    def load(cls, path):
+        frontier = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as checkpoint_file:
+                for article in json.load(checkpoint_file):
+                    frontier.articles[canonical_article_id(article['url'])] = article
+            logging.info(f"Resuming {len(frontier)} queued articles from {path}")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logging.error(f"Ignoring unreadable frontier checkpoint {path}: {e}")
+        return frontier
+
+    def __len__(self):
+        return len(self.articles)
+
+    def __bool__(self):
+        return bool(self.articles)
+
+    def __contains__(self, url):
+        return canonical_article_id(url) in self.articles
+
+    def add(self, url, tag):
+        """Queue url for tag. Returns True if the article was new to the frontier."""
+        article_id = canonical_article_id(url)
+        article = self.articles.get(article_id)
+        if article is not None:
+            if tag not in article['tags']:
+                article['tags'].append(tag)
+            return False
+        self.articles[article_id] = {'url': url, 'tags': [tag]}
+        return True
+
+    def add_all(self, articles_by_tag):
+        """Queue {tag: [urls]} and checkpoint once. Returns how many articles were new."""
+        added = 0
+        for tag, urls in articles_by_tag.items():
+            for url in urls:
+                added += self.add(url, tag)
+        self.checkpoint()
+        logging.info(f"Frontier: {added} new articles queued, {len(self)} in total")
+        return added
+
+    def peek(self):
+        """Return the oldest queued article without removing it."""
+        return next(iter(self.articles.values())) if self.articles else None
+
+    def done(self, url):
+        """Drop url from the frontier once it has been processed, and checkpoint."""
+        self.articles.pop(canonical_article_id(url), None)
+        self.checkpoint()
+
+    def retry(self, url, max_attempts):
+        """
+        Count a failed attempt at url and move it to the back of the queue, or
+        drop it once it has failed max_attempts times. Returns True if it was
+        queued again.
+        """
+        article_id = canonical_article_id(url)
+        article = self.articles.pop(article_id, None)
+        if article is None:
+            return False
+        article['attempts'] = article.get('attempts', 0) + 1
+        requeued = article['attempts'] < max_attempts
+        if requeued:
+            self.articles[article_id] = article
+            logging.info(f"Queued {url} again after {article['attempts']} failed attempt(s)")
+        else:
+            logging.error(f"Giving up on {url} after {article['attempts']} failed attempts")
+        self.checkpoint()
+        return requeued
+
+    def checkpoint(self):
+        """Write the queue atomically."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(list(self.articles.values()), checkpoint_file)
+        os.replace(temp_path, self.path)
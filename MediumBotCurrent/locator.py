@@ -0,0 +1,127 @@
+import logging
+from urllib.parse import urlparse
+
+# Locator Strategies
+DOM_STRATEGY = 'dom'
+TEMPLATE_STRATEGY = 'template'
+DOM_MISS_LIMIT = 3  # DOM misses in a row, each rescued by template matching, before a layout tries templates first
+DOM_RETRY_AFTER = 10  # Template-first hits on such a layout before the DOM query is given another turn first
+
+# Looks up an element by CSS selector first, then by aria-label/visible text,
+# scrolls it into view and returns its centre in viewport and page coordinates,
+# along with its label and whether it is in the pressed/active state.
+# With exactLabels, selector hits must also carry one of the labels and not be
+# pressed, so a toggle already switched on (Following) is never returned.
+FIND_ELEMENT_JS = '''
+(selectors, labels, exactLabels) => {
+    const wanted = labels.map(label => label.toLowerCase());
+    const labelOf = el => (el.getAttribute('aria-label') || el.innerText || '').trim().toLowerCase();
+    const pressed = el => el.getAttribute('aria-pressed') === 'true' || /\\b(clapped|is-active)\\b/.test(el.getAttribute('class') || '');
+    const centre = (el, how) => {
+        el.scrollIntoView({block: 'center', inline: 'center'});
+        const r = el.getBoundingClientRect();
+        if (r.width === 0 || r.height === 0) { return null; }
+        const x = r.left + r.width / 2, y = r.top + r.height / 2;
+        return {how: how, x: x, y: y, pageX: x + window.scrollX, pageY: y + window.scrollY, label: labelOf(el), pressed: pressed(el)};
+    };
+    for (const selector of selectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            if (exactLabels && (!wanted.includes(labelOf(el)) || pressed(el))) { continue; }
+            const hit = centre(el, 'selector ' + selector);
+            if (hit) { return hit; }
+        }
+    }
+    for (const el of document.querySelectorAll('button, [role="button"]')) {
+        const label = labelOf(el);
+        if (wanted.includes(label) && !(exactLabels && pressed(el))) {
+            const hit = centre(el, 'label ' + label);
+            if (hit) { return hit; }
+        }
+    }
+    return null;
+}
+'''
+
+
+class LocatorTarget:
+    """
+    DOM hints for one on-page element the bot needs to click. With
+    exact_labels, selector hits must also read exactly one of labels and not
+    be pressed, for toggles whose other state shares the same selector.
+    """
+
+    def __init__(self, name, selectors, labels, exact_labels=False):
+        self.name = name
+        self.selectors = selectors
+        self.labels = labels
+        self.exact_labels = exact_labels
+
+
+def layout_key(url):
+    """Medium serves user posts (/@user/...), publication posts and custom-domain publications with different markup."""
+    parsed = urlparse(url)
+    if parsed.netloc.endswith('medium.com'):
+        return f"{parsed.netloc}:{'user' if parsed.path.startswith('/@') else 'publication'}"
+    return f"{parsed.netloc}:custom-domain"
+
+
+class ElementLocator:
+    """
+    Finds clickable elements with one page.evaluate DOM query and falls back to
+    template matching only when the DOM lookup fails. The DOM query always
+    goes first, except on a layout and target where it has missed
+    DOM_MISS_LIMIT times in a row while template matching found the element;
+    there templates go first and the DOM query is only the fallback, until
+    DOM_RETRY_AFTER template hits later it gets another turn first. A DOM hit
+    on that layout puts it back first for good.
+    """
+
+    def __init__(self, targets):
+        self.targets = {target.name: target for target in targets}
+        self.dom_misses = {}  # (layout, target name) -> DOM misses in a row that template matching rescued
+        self.template_first = {}  # (layout, target name) -> template-first hits since the DOM query last went first
+        self.stats = {DOM_STRATEGY: 0, TEMPLATE_STRATEGY: 0, 'missed': 0}
+
+    async def locate_dom(self, page, name):
+        target = self.targets[name]
+        try:
+            return await page.evaluate(FIND_ELEMENT_JS, target.selectors, target.labels, target.exact_labels)
+        except Exception as e:
+            logging.info(f"DOM lookup for {name} failed: {e}")
+            return None
+
+    async def locate(self, page, name, fallback=None):
+        """
+        Return (strategy, hit). A DOM hit is a dict with viewport x/y and page
+        pageX/pageY centre coordinates, label and pressed; a template hit is whatever fallback()
+        returned. Returns (None, None) when every strategy misses.
+        """
+        layout = layout_key(page.url)
+        strategies = [DOM_STRATEGY, TEMPLATE_STRATEGY]
+        if self.dom_misses.get((layout, name), 0) >= DOM_MISS_LIMIT:
+            strategies.reverse()
+
+        for strategy in strategies:
+            if strategy == DOM_STRATEGY:
+                hit = await self.locate_dom(page, name)
+            elif fallback is not None:
+                hit = await fallback()
+            else:
+                continue
+            if hit:
+                if strategy == DOM_STRATEGY:
+                    self.dom_misses[(layout, name)] = 0
+                elif strategies[0] == DOM_STRATEGY:
+                    self.dom_misses[(layout, name)] = self.dom_misses.get((layout, name), 0) + 1
+                    self.template_first[(layout, name)] = 0
+                else:
+                    self.template_first[(layout, name)] = self.template_first.get((layout, name), 0) + 1
+                    if self.template_first[(layout, name)] >= DOM_RETRY_AFTER:
+                        self.dom_misses[(layout, name)] = DOM_MISS_LIMIT - 1  # One more rescued miss skips it again
+                self.stats[strategy] += 1
+                logging.info(f"Located {name} on {layout} layout using {strategy}" + (f" ({hit['how']})" if strategy == DOM_STRATEGY else ""))
+                return strategy, hit
+
+        self.stats['missed'] += 1
+        logging.info(f"Could not locate {name} on {layout} layout")
+        return None, None
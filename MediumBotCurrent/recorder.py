@@ -0,0 +1,242 @@
+import contextvars
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import cv2
+import numpy as np
+from visited import canonical_article_id
+
+# Recording Format
+RECORDING_VERSION = 1
+FRAMES_DIR = 'frames'  # <root>/frames/ab/abcdef....png, keyed by a hash of the gray pixels
+DOM_DIR = 'dom'  # <root>/dom/ab/abcdef....html.gz, keyed by a hash of the HTML
+ARTICLES_DIR = 'articles'  # <root>/articles/<start time>-<article id>.json, one per article
+PNG_COMPRESSION = 3  # zlib level for stored frames; higher is smaller but slower to write
+
+_STOP = object()
+
+# The recording the current coroutine's detections belong to
+current_recording = contextvars.ContextVar('current_recording', default=None)
+
+
+def frame_key(image):
+    """Content address of a grayscale frame: a hash of its shape and pixels."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(image.shape).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def _blob_path(root, directory, key, suffix):
+    return os.path.join(root, directory, key[:2], key + suffix)
+
+
+# Content-Addressed Store
+class CaptureStore:
+    """
+    Frames and DOM snapshots stored once per distinct content. Encoding and
+    writing happen on a background thread, so detections only pay for hashing
+    and, for frames not seen before, a copy.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.stats = {'frames': 0, 'frames_deduplicated': 0, 'dom': 0, 'dom_deduplicated': 0, 'bytes': 0}
+        self._known = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+
+    def _claim(self, path):
+        """True if path still has to be written; False when it is already stored or queued."""
+        with self._lock:
+            if path in self._known:
+                return False
+            self._known.add(path)
+        return not os.path.exists(path)
+
+    def put_frame(self, image):
+        key = frame_key(image)
+        path = _blob_path(self.root, FRAMES_DIR, key, '.png')
+        if self._claim(path):
+            self.stats['frames'] += 1
+            self._enqueue(path, np.array(image, copy=True))  # Capture buffers get reused by the next grab
+        else:
+            self.stats['frames_deduplicated'] += 1
+        return key
+
+    def put_dom(self, html):
+        data = html.encode('utf-8')
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        path = _blob_path(self.root, DOM_DIR, key, '.html.gz')
+        if self._claim(path):
+            self.stats['dom'] += 1
+            self._enqueue(path, data)
+        else:
+            self.stats['dom_deduplicated'] += 1
+        return key
+
+    def load_frame(self, key):
+        image = cv2.imread(_blob_path(self.root, FRAMES_DIR, key, '.png'), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise FileNotFoundError(f"Recorded frame {key} is missing from {self.root}")
+        return image
+
+    def load_dom(self, key):
+        with gzip.open(_blob_path(self.root, DOM_DIR, key, '.html.gz'), 'rt', encoding='utf-8') as dom_file:
+            return dom_file.read()
+
+    def _enqueue(self, path, payload):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run, name='capture-store', daemon=True)
+            self._writer.start()
+        self._queue.put((path, payload))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            path, payload = item
+            try:
+                if isinstance(payload, np.ndarray):
+                    data = cv2.imencode('.png', payload, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION])[1].tobytes()
+                else:
+                    data = gzip.compress(payload)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = path + '.tmp'
+                with open(temp_path, 'wb') as blob_file:
+                    blob_file.write(data)
+                os.replace(temp_path, path)
+                self.stats['bytes'] += len(data)
+            except Exception as e:
+                logging.error(f"Error writing capture {path}: {e}")
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+
+# Per-Article Recording
+class ArticleRecording:
+    """Everything captured while the bot worked on one article."""
+
+    def __init__(self, store, url):
+        self.store = store
+        self.url = url
+        self.article_id = canonical_article_id(url)
+        self.started = time.time()
+        self.detections = []
+        self.dom = []
+        self.templates = {}  # name -> {'path', 'frame'}
+        self.timings = {}
+        self.results = {}
+
+    def add_detection(self, detector, image, templates, roi, threshold, matches, seconds, **extra):
+        for template in templates:
+            if template.name not in self.templates:
+                self.templates[template.name] = {'path': template.path, 'frame': self.store.put_frame(template.image)}
+        detection = {
+            'detector': detector,
+            'frame': self.store.put_frame(image),
+            'shape': list(image.shape[:2]),
+            'templates': [template.name for template in templates],
+            'roi': list(roi) if roi is not None else None,
+            'threshold': threshold,
+            'scores': {name: [float(max_val), list(max_loc) if max_loc is not None else None]
+                       for name, (max_val, max_loc) in matches.scores.items()},
+            'seconds': seconds,
+            'at': time.time() - self.started,
+        }
+        detection.update(extra)
+        self.detections.append(detection)
+        return detection
+
+    def add_dom(self, detector, html):
+        self.dom.append({'detector': detector, 'snapshot': self.store.put_dom(html), 'at': time.time() - self.started})
+
+    def to_json(self):
+        return {
+            'version': RECORDING_VERSION,
+            'url': self.url,
+            'article_id': self.article_id,
+            'started': self.started,
+            'templates': self.templates,
+            'detections': self.detections,
+            'dom': self.dom,
+            'timings': self.timings,
+            'results': {name: result if isinstance(result, (bool, int, float, str, type(None))) else repr(result)
+                        for name, result in self.results.items()},
+        }
+
+
+class CaptureRecorder:
+    """
+    Opt-in recorder for detection regressions and profiling. Wrap each
+    article in recorder.article(url); detectors called meanwhile report
+    through record_detection/record_dom, and the article's record is
+    written as JSON when the block exits. Replay it with replay.py.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.store = CaptureStore(root)
+        self.articles = 0
+        os.makedirs(os.path.join(root, ARTICLES_DIR), exist_ok=True)
+
+    @contextmanager
+    def article(self, url):
+        recording = ArticleRecording(self.store, url)
+        token = current_recording.set(recording)
+        try:
+            yield recording
+        finally:
+            current_recording.reset(token)
+            self.save(recording)
+
+    def save(self, recording):
+        name = time.strftime('%Y%m%d-%H%M%S', time.localtime(recording.started)) + f'-{recording.article_id.replace("/", "_")[:80]}.json'
+        path = os.path.join(self.root, ARTICLES_DIR, name)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as record_file:
+            json.dump(recording.to_json(), record_file)
+        os.replace(temp_path, path)
+        self.articles += 1
+
+    def close(self):
+        self.store.close()
+        logging.info(f"Recorded {self.articles} articles to {self.root}: {self.store.stats}")
+
+
+def record_detection(detector, image, templates, roi, threshold, matches, seconds, **extra):
+    """Add a detection to the current article's recording; a no-op when nothing is being recorded."""
+    recording = current_recording.get()
+    if recording is not None:
+        recording.add_detection(detector, image, templates, roi, threshold, matches, seconds, **extra)
+
+
+async def record_dom(detector, page):
+    """Snapshot the page's DOM into the current recording, if any."""
+    recording = current_recording.get()
+    if recording is None:
+        return
+    try:
+        recording.add_dom(detector, await page.content())
+    except Exception as e:
+        logging.info(f"Could not snapshot the DOM for {detector}: {e}")
+
+
+def load_recordings(root):
+    """Yield (path, record) for every article recorded under root, oldest first."""
+    for path in sorted(glob.glob(os.path.join(root, ARTICLES_DIR, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as record_file:
+            yield path, json.load(record_file)
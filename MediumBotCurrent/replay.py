@@ -0,0 +1,144 @@
+"""
+Rerun today's detectors over frames captured by the recorder (RECORD_DIR in
+config.json) and compare them with what the recorded run decided and how
+long it took. Run from MediumBotCurrent:
+
+    python replay.py recordings
+    python replay.py recordings --template clap=buttontemps/clap_button_template.png --json replay.json
+
+By default each detection is replayed with the template images recorded
+alongside it; --template swaps in a new image for one template name.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import time
+import cv2
+from recorder import CaptureStore, load_recordings
+from vision import ButtonTemplate, MatchResult, locate_templates
+
+LOCATION_TOLERANCE = 3  # Pixels a match may move and still count as the same hit
+REPEAT = 3
+
+
+def decision(scores, names, threshold):
+    """(template name, location) of the first template that cleared threshold, like MatchResult.first."""
+    return MatchResult({name: (score[0], tuple(score[1]) if score[1] is not None else None)
+                        for name, score in scores.items()}).first(names, threshold)
+
+
+def same_hit(recorded, replayed, tolerance):
+    (recorded_name, recorded_loc), (replayed_name, replayed_loc) = recorded, replayed
+    if recorded_name != replayed_name:
+        return False
+    if recorded_loc is None:
+        return True
+    return max(abs(recorded_loc[0] - replayed_loc[0]), abs(recorded_loc[1] - replayed_loc[1])) <= tolerance
+
+
+class Replayer:
+    """Loads recorded frames and templates and reruns locate_templates on them."""
+
+    def __init__(self, root, template_paths=None, repeat=REPEAT, tolerance=LOCATION_TOLERANCE):
+        self.store = CaptureStore(root)
+        self.template_paths = template_paths or {}
+        self.repeat = repeat
+        self.tolerance = tolerance
+        self._templates = {}
+
+    def template(self, name, recorded):
+        key = (name, recorded['frame'])
+        if key not in self._templates:
+            if name in self.template_paths:
+                image = cv2.imread(self.template_paths[name], cv2.IMREAD_GRAYSCALE)
+                if image is None:
+                    raise FileNotFoundError(f"Could not read template image: {self.template_paths[name]}")
+                self._templates[key] = ButtonTemplate(name, self.template_paths[name], image)
+            else:
+                self._templates[key] = ButtonTemplate(name, recorded['path'], self.store.load_frame(recorded['frame']))
+        return self._templates[key]
+
+    def replay(self, record, detection):
+        image = self.store.load_frame(detection['frame'])
+        templates = [self.template(name, record['templates'][name]) for name in detection['templates']]
+        roi = tuple(detection['roi']) if detection['roi'] is not None else None
+        threshold = detection['threshold']
+        seconds = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            matches = locate_templates(image, templates, threshold, roi)
+            seconds.append(time.perf_counter() - started)
+        scores = {name: [float(max_val), list(max_loc) if max_loc is not None else None] for name, (max_val, max_loc) in matches.scores.items()}
+        recorded = decision(detection['scores'], detection['templates'], threshold)
+        replayed = decision(scores, detection['templates'], threshold)
+        return {
+            'article': record['url'],
+            'detector': detection['detector'],
+            'frame': detection['frame'],
+            'recorded': {'hit': recorded[0], 'location': recorded[1], 'scores': detection['scores'], 'seconds': detection['seconds']},
+            'replayed': {'hit': replayed[0], 'location': replayed[1], 'scores': scores, 'seconds': min(seconds)},
+            'agrees': same_hit(recorded, replayed, self.tolerance),
+        }
+
+
+def summarize(comparisons):
+    """Per-detector agreement and recorded vs replayed median timings."""
+    summary = {}
+    for detector in sorted(set(comparison['detector'] for comparison in comparisons)):
+        rows = [comparison for comparison in comparisons if comparison['detector'] == detector]
+        recorded_ms = statistics.median(row['recorded']['seconds'] for row in rows) * 1000
+        replayed_ms = statistics.median(row['replayed']['seconds'] for row in rows) * 1000
+        summary[detector] = {
+            'detections': len(rows),
+            'agreement': sum(row['agrees'] for row in rows) / len(rows),
+            'recorded_hits': sum(row['recorded']['hit'] is not None for row in rows),
+            'replayed_hits': sum(row['replayed']['hit'] is not None for row in rows),
+            'recorded_median_ms': recorded_ms,
+            'replayed_median_ms': replayed_ms,
+            'speedup': recorded_ms / replayed_ms if replayed_ms else None,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('root', help='the RECORD_DIR the bot recorded into')
+    parser.add_argument('--template', action='append', default=[], metavar='NAME=PATH', help='replay with this template image instead of the recorded one')
+    parser.add_argument('--detector', action='append', help="only replay this detector ('clap', 'follow', 'strip'); repeatable")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='timed runs per detection; the fastest is reported')
+    parser.add_argument('--tolerance', type=int, default=LOCATION_TOLERANCE, help='pixels a hit may move and still agree')
+    parser.add_argument('--json', metavar='PATH', help='write every comparison and the summary as JSON')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    template_paths = dict(item.split('=', 1) for item in args.template)
+    replayer = Replayer(args.root, template_paths, args.repeat, args.tolerance)
+    comparisons = []
+    for path, record in load_recordings(args.root):
+        for detection in record['detections']:
+            if args.detector and detection['detector'] not in args.detector:
+                continue
+            comparison = replayer.replay(record, detection)
+            comparisons.append(comparison)
+            if not comparison['agrees']:
+                print(f"CHANGED {comparison['detector']} on {record['url']} (frame {comparison['frame']}): "
+                      f"{comparison['recorded']['hit']}@{comparison['recorded']['location']} -> "
+                      f"{comparison['replayed']['hit']}@{comparison['replayed']['location']}")
+
+    summary = summarize(comparisons)
+    for detector, row in summary.items():
+        speedup = f"{row['speedup']:.1f}x" if row['speedup'] else 'n/a'
+        print(f"{detector:<8} {row['detections']:>5} detections, {row['agreement']:.0%} agree, "
+              f"hits {row['recorded_hits']} -> {row['replayed_hits']}, "
+              f"median {row['recorded_median_ms']:.1f} ms -> {row['replayed_median_ms']:.1f} ms ({speedup})")
+    if not comparisons:
+        print(f"No recorded detections found under {args.root}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as results_file:
+            json.dump({'summary': summary, 'comparisons': comparisons}, results_file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
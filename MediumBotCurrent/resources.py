@@ -0,0 +1,190 @@
+import asyncio
+import base64
+import logging
+from fnmatch import fnmatchcase
+
+# Typical transfer sizes used to estimate savings for resource types that were
+# never allowed through this run (bytes).
+ESTIMATED_BYTES = {
+    'image': 120000,
+    'media': 500000,
+    'font': 40000,
+    'script': 60000,
+    'xhr': 3000,
+    'fetch': 3000,
+    'document': 80000,
+    'other': 5000,
+}
+
+ALLOW = 'allow'
+BLOCK = 'block'
+STUB = 'stub'
+
+# Resource type names as the Fetch domain spells them
+CDP_RESOURCE_TYPES = {
+    'image': 'Image', 'media': 'Media', 'font': 'Font', 'script': 'Script', 'stylesheet': 'Stylesheet',
+    'xhr': 'XHR', 'fetch': 'Fetch', 'document': 'Document', 'other': 'Other',
+}
+
+
+class ResourcePolicy:
+    """
+    Decides per request whether to let it through, abort it, or answer it with
+    an empty stub (for beacons and scripts whose failure would trigger retries). Patterns
+    are CDP URL wildcards ('*' and '?') matched against the whole request URL;
+    allowed patterns win over everything else.
+    """
+
+    def __init__(self, name, blocked_types=(), blocked_patterns=(), stubbed_patterns=(), allowed_patterns=()):
+        self.name = name
+        self.blocked_types = set(blocked_types)
+        self.blocked_patterns = list(blocked_patterns)
+        self.stubbed_patterns = list(stubbed_patterns)
+        self.allowed_patterns = list(allowed_patterns)
+
+    def decide(self, url, resource_type):
+        if any(fnmatchcase(url, pattern) for pattern in self.allowed_patterns):
+            return ALLOW
+        if any(fnmatchcase(url, pattern) for pattern in self.stubbed_patterns):
+            return STUB
+        if resource_type in self.blocked_types or any(fnmatchcase(url, pattern) for pattern in self.blocked_patterns):
+            return BLOCK
+        return ALLOW
+
+    def fetch_patterns(self):
+        """Fetch.enable patterns: only requests this policy might block or stub are paused in the browser."""
+        patterns = [{'resourceType': CDP_RESOURCE_TYPES.get(resource_type, resource_type.title()), 'requestStage': 'Request'}
+                    for resource_type in sorted(self.blocked_types)]
+        patterns += [{'urlPattern': pattern, 'requestStage': 'Request'} for pattern in self.stubbed_patterns + self.blocked_patterns]
+        return patterns
+
+    async def attach(self, page):
+        """Start blocking for page and return its PageResourceStats."""
+        stats = PageResourceStats(self)
+        await stats.attach(page)
+        return stats
+
+
+class PageResourceStats:
+    """
+    Applies a ResourcePolicy to one page and counts what it let through,
+    blocked and stubbed. Blocking runs on the Fetch domain of a CDP session of
+    our own rather than pyppeteer's setRequestInterception, which also sends
+    Network.setCacheDisabled and would make every article re-download
+    Medium's scripts and styles instead of reusing the profile's HTTP cache.
+    Only requests matching the policy's patterns are paused; everything else
+    goes straight through the browser, cache included.
+    """
+
+    # Average transfer size per resource type, learned from allowed network responses across pages
+    observed_bytes = {}
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.requests = {ALLOW: 0, BLOCK: 0, STUB: 0}
+        self.saved_by_type = {}
+        self.bytes_loaded = 0
+        self.from_cache = 0
+        self._types = {}
+        self._cached = set()
+        self._client = None
+
+    async def attach(self, page):
+        self._client = await page.target.createCDPSession()
+        self._client.on('Fetch.requestPaused', lambda params: asyncio.ensure_future(self._on_paused(params)))
+        self._client.on('Network.responseReceived', self._on_response)
+        self._client.on('Network.requestServedFromCache', self._on_served_from_cache)
+        self._client.on('Network.loadingFinished', self._on_finished)
+        await self._client.send('Network.enable')
+        await self._client.send('Fetch.enable', {'patterns': self.policy.fetch_patterns()})
+
+    async def _on_paused(self, params):
+        resource_type = params.get('resourceType', 'Other').lower()
+        decision = self.policy.decide(params['request']['url'], resource_type)
+        try:
+            if decision == ALLOW:
+                await self._client.send('Fetch.continueRequest', {'requestId': params['requestId']})
+                return
+            self.requests[decision] += 1
+            self.saved_by_type[resource_type] = self.saved_by_type.get(resource_type, 0) + 1
+            if decision == STUB:
+                content_type, body = ('application/javascript', b'') if resource_type == 'script' else ('application/json', b'{}')
+                await self._client.send('Fetch.fulfillRequest', {
+                    'requestId': params['requestId'],
+                    'responseCode': 200,
+                    'responseHeaders': [{'name': 'Content-Type', 'value': content_type}],
+                    'body': base64.b64encode(body).decode('ascii'),
+                })
+            else:
+                await self._client.send('Fetch.failRequest', {'requestId': params['requestId'], 'errorReason': 'BlockedByClient'})
+        except Exception as e:
+            logging.info(f"Request already handled ({params['request']['url']}): {e}")
+
+    def _on_response(self, params):
+        self._types[params['requestId']] = params.get('type', 'Other').lower()
+        if params.get('response', {}).get('fromDiskCache'):
+            self._on_served_from_cache(params)
+
+    def _on_served_from_cache(self, params):
+        self._cached.add(params['requestId'])
+
+    def _on_finished(self, params):
+        size = params.get('encodedDataLength', 0)
+        self.requests[ALLOW] += 1
+        self.bytes_loaded += size
+        resource_type = self._types.pop(params['requestId'], 'other')
+        if params['requestId'] in self._cached:
+            self._cached.discard(params['requestId'])
+            self.from_cache += 1
+            return  # A cache hit says nothing about the type's transfer size
+        count, total = self.observed_bytes.get(resource_type, (0, 0))
+        self.observed_bytes[resource_type] = (count + 1, total + size)
+
+    def estimated_bytes_saved(self):
+        saved = 0
+        for resource_type, count in self.saved_by_type.items():
+            observed_count, observed_total = self.observed_bytes.get(resource_type, (0, 0))
+            average = observed_total / observed_count if observed_count else ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES['other'])
+            saved += count * average
+        return int(saved)
+
+    def report(self, url):
+        saved = self.requests[BLOCK] + self.requests[STUB]
+        logging.info(f"Resource profile {self.policy.name} on {url}: {self.requests[ALLOW]} requests loaded "
+                     f"({self.bytes_loaded / 1024:.0f} KiB, {self.from_cache} from the HTTP cache), {saved} blocked/stubbed {self.saved_by_type} "
+                     f"(~{self.estimated_bytes_saved() / 1024:.0f} KiB saved)")
+
+    async def detach(self):
+        """Stop blocking so the tab can be reused under a different policy."""
+        if self._client is not None:
+            try:
+                await self._client.send('Fetch.disable')
+                await self._client.detach()
+            except Exception:
+                pass
+            self._client = None
+
+
+# Resource Profiles
+RESOURCE_PROFILES = {
+    'off': None,
+    'lean': ResourcePolicy(
+        'lean',
+        # Fonts stay: the follow template matches "Follow" drawn in Medium's web font
+        blocked_types=['image', 'media'],
+        blocked_patterns=[
+            '*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*', '*googlesyndication.com/*',
+            '*branch.io/*', '*sentry.io/*', '*segment.io/*', '*segment.com/*', '*amplitude.com/*', '*connect.facebook.net/*',
+            '*cdn.embedly.com/*', '*youtube.com/embed*', '*platform.twitter.com/*', '*gist.github.com/*',
+        ],
+        stubbed_patterns=['*medium.com/_/batch*'],
+        # Keep the small vector UI sprites the clap/follow detectors look at
+        allowed_patterns=['*.svg', '*.svg?*'],
+    ),
+}
+
+
+def resource_policy(name):
+    if name not in RESOURCE_PROFILES:
+        raise ValueError(f"Unknown resource profile: {name}. Expected one of {', '.join(RESOURCE_PROFILES)}")
+    return RESOURCE_PROFILES[name]
@@ -0,0 +1,67 @@
+import logging
+import time
+from tracing import STAGE, current_article, trace_span
+
+
+class ArticleSession:
+    """
+    Loads one article into one tab and runs a list of (name, stage) coroutines
+    against that same Page, so each article costs a single navigation. Each
+    stage's result, or the error it raised, is kept in results. A page that
+    fails to load (timeout, net::ERR_*) is recorded under results['navigate']
+    and its stages are skipped, so one bad URL never aborts the run.
+    """
+
+    def __init__(self, pages, url, stages, resource_policy=None):
+        self.pages = pages  # Anything with async acquire() and release(page), e.g. BrowserManager
+        self.url = url
+        self.stages = stages
+        self.resource_policy = resource_policy
+        self.resource_stats = None
+        self.results = {}
+        self.timings = {}
+
+    async def run(self):
+        article_token = current_article.set(self.url)
+        page = await self.pages.acquire()
+        try:
+            if self.resource_policy is not None:
+                self.resource_stats = await self.resource_policy.attach(page)
+            started = time.perf_counter()
+            try:
+                with trace_span('navigate'):
+                    await page.goto(self.url)
+            except Exception as e:
+                logging.error(f"Could not load {self.url}: {e}")
+                self.results['navigate'] = e
+            self.timings['goto'] = time.perf_counter() - started
+
+            for name, stage in self.stages if self.navigated() else []:
+                started = time.perf_counter()
+                with trace_span(f'stage.{name}', STAGE) as span:
+                    try:
+                        self.results[name] = await stage(page)
+                    except Exception as e:
+                        logging.error(f"Stage {name} failed on {self.url}: {e}")
+                        self.results[name] = e
+                    span['result'] = self.results[name]
+                self.timings[name] = time.perf_counter() - started
+        finally:
+            if self.resource_stats is not None:
+                self.resource_stats.report(self.url)
+                await self.resource_stats.detach()
+            await self.pages.release(page)
+            current_article.reset(article_token)
+
+        summary = ', '.join(f"{name}={self.results.get(name)!r}" for name, _ in self.stages)
+        if not self.navigated():
+            summary = f"navigate={self.results['navigate']!r}"
+        logging.info(f"Finished {self.url} in {sum(self.timings.values()):.1f}s, page load {self.timings.get('goto', 0):.1f}s ({summary})")
+        return self.results
+
+    def navigated(self):
+        return not isinstance(self.results.get('navigate'), Exception)
+
+    def succeeded(self, name):
+        result = self.results.get(name)
+        return bool(result) and not isinstance(result, Exception)
@@ -0,0 +1,99 @@
+"""
+FeedCache and fetch_all_feed_links against fixture_server.FixtureServer, a local stand-in for Medium's
+tag feeds with ETag / 304 support. Run from MediumBotCurrent:
+
+    python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+from feeds import FeedCache, fetch_all_feed_links
+from fixture_server import FixtureServer
+
+TAGS = ['python', 'data-science']
+
+
+class FeedCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FixtureServer(port=0).start()
+        self.feed_url = self.server.base_url + '/feed/tag/{tag}'
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'feed_cache.json')
+        self.cache = FeedCache(self.cache_path)
+
+    def tearDown(self):
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def feed_requests(self):
+        return self.server.site.stats['requests'].get('feed', 0)
+
+    def fetch(self, tags=TAGS, feed_url=None):
+        return asyncio.run(fetch_all_feed_links(tags, self.cache, feed_url or self.feed_url))
+
+    def test_first_fetch_parses_then_304_reuses_links(self):
+        first = self.fetch()
+        self.assertEqual(list(first), TAGS)
+        self.assertTrue(all(len(links) == self.server.site.per_tag for links in first.values()))
+        self.assertEqual(self.cache.stats['parsed'], len(TAGS))
+
+        self.assertEqual(self.fetch(), first)
+        self.assertEqual(self.cache.stats['not_modified'], len(TAGS))
+        self.assertEqual(self.cache.stats['parsed'], len(TAGS))
+        self.assertEqual(self.feed_requests(), 2 * len(TAGS))
+        self.assertEqual(self.cache.hit_rate(), 0.5)
+
+    def test_conditional_headers_survive_save_and_reload(self):
+        links = self.fetch(['python'])
+        self.cache.save()
+
+        self.cache = FeedCache(self.cache_path)
+        self.assertIn('If-None-Match', self.cache.request_headers('python'))
+        self.assertEqual(self.fetch(['python']), links)
+        self.assertEqual(self.cache.stats, {'not_modified': 1, 'unchanged': 0, 'parsed': 0, 'errors': 0})
+
+    def test_unchanged_guids_skip_parsing(self):
+        links = self.fetch(['python'])
+        # Without validators the server answers 200 with the same entries
+        self.cache.entries['python'].update(etag=None, modified=None)
+
+        with mock.patch('feeds.parse_feed_links', side_effect=AssertionError('feed was parsed')):
+            self.assertEqual(self.fetch(['python']), links)
+        self.assertEqual(self.cache.stats['unchanged'], 1)
+        self.assertEqual(self.cache.stats['parsed'], 1)
+
+    def test_http_error_returns_no_links(self):
+        self.assertEqual(self.fetch(feed_url=self.server.base_url + '/missing/{tag}'), {tag: [] for tag in TAGS})
+        self.assertEqual(self.cache.stats['errors'], len(TAGS))
+        self.assertEqual(self.cache.entries, {})
+
+    def test_unreachable_server_returns_no_links(self):
+        stopped = FixtureServer(port=0).start()
+        stopped.stop()
+        self.assertEqual(self.fetch(feed_url=stopped.base_url + '/feed/tag/{tag}'), {tag: [] for tag in TAGS})
+        self.assertEqual(self.cache.stats['errors'], len(TAGS))
+
+    def test_304_without_cached_entry_is_an_error(self):
+        self.assertEqual(self.cache.resolve('python', 304, {}, None), [])
+        self.assertEqual(self.cache.stats['errors'], 1)
+
+    def test_malformed_feed_returns_no_links(self):
+        self.assertEqual(self.cache.resolve('python', 200, {}, b'<html><body>Service unavailable'), [])
+        self.assertEqual(self.cache.stats['errors'], 1)
+
+    def test_truncated_feed_falls_back_to_feedparser(self):
+        self.assertEqual(self.cache.resolve('python', 200, {}, b'<rss><channel><item><link>'), [])
+        self.assertEqual(self.cache.stats['errors'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
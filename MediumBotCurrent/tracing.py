@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Span Kinds
+WORK = 'work'  # Leaf spans: time the bot actually spent doing something
+SLEEP = 'sleep'  # Deliberate waits (reading time, human-like pauses)
+STAGE = 'stage'  # Spans that wrap other spans and sleeps, e.g. a whole article stage
+
+REPORT_PERCENTILES = (50, 95, 99)
+
+# The article the current coroutine is working on, attached to every span it records
+current_article = contextvars.ContextVar('current_article', default=None)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+# Tracer
+class Tracer:
+    """
+    Records timed spans and match scores. Each span is appended as one JSON
+    line to the trace file (when there is one) and kept in memory for the
+    run report. Spans may be recorded from the vision worker threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.durations = {}  # name -> [seconds]
+        self.kinds = {}  # name -> span kind
+        self.scores = {}  # template name -> [max_val]
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def record(self, name, duration, kind=WORK, start=None, **attrs):
+        event = {'name': name, 'kind': kind, 'start': start if start is not None else time.time() - duration,
+                 'duration': round(duration, 6), 'article': current_article.get()}
+        event.update(attrs)
+        with self._lock:
+            self.durations.setdefault(name, []).append(duration)
+            self.kinds[name] = kind
+            if self._file is not None:
+                self._file.write(json.dumps(event, default=str) + '\n')
+
+    @contextmanager
+    def span(self, name, kind=WORK, **attrs):
+        """Time the body of a with block. Attributes can be added to the yielded dict."""
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = repr(e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, kind, start, **attrs)
+
+    async def sleep(self, seconds, name='sleep'):
+        """asyncio.sleep that is accounted as sleep time rather than work."""
+        with self.span(name, SLEEP, seconds=round(seconds, 3)):
+            await asyncio.sleep(seconds)
+
+    def score(self, template_name, value):
+        with self._lock:
+            self.scores.setdefault(template_name, []).append(float(value))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def report(self):
+        """Per-span latency percentiles, work vs sleep totals and match score distributions."""
+        with self._lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+            kinds = dict(self.kinds)
+            scores = {name: sorted(values) for name, values in self.scores.items()}
+        header = ' '.join(f"{'p' + str(p):>8}" for p in REPORT_PERCENTILES)
+        lines = [f"Run report after {time.perf_counter() - self.started:.1f}s",
+                 f"{'span':<24} {'kind':<6} {'count':>6} {header} {'total':>9}"]
+        totals = {WORK: 0.0, SLEEP: 0.0}
+        for name in sorted(durations, key=lambda key: (kinds[key], key)):
+            values = durations[name]
+            if kinds[name] in totals:
+                totals[kinds[name]] += sum(values)
+            columns = ' '.join(f"{percentile(values, p) * 1000:>6.0f}ms" for p in REPORT_PERCENTILES)
+            lines.append(f"{name:<24} {kinds[name]:<6} {len(values):>6} {columns} {sum(values):>8.1f}s")
+        lines.append(f"Work {totals[WORK]:.1f}s, sleep {totals[SLEEP]:.1f}s")
+        for name, values in sorted(scores.items()):
+            columns = ', '.join(f"p{p} {percentile(values, p):.3f}" for p in REPORT_PERCENTILES)
+            lines.append(f"Match scores {name}: {len(values)} samples, min {values[0]:.3f}, {columns}, max {values[-1]:.3f}")
+        return '\n'.join(lines)
+
+
+TRACER = Tracer()
+
+
+def configure_tracing(path):
+    """Start a fresh tracer writing spans to path (None keeps them in memory only)."""
+    global TRACER
+    TRACER.close()
+    TRACER = Tracer(path)
+    logging.info(f"Tracing spans to {path}" if path else "Tracing spans in memory only")
+    return TRACER
+
+
+def tracer():
+    return TRACER
+
+
+def trace_span(name, kind=WORK, **attrs):
+    return TRACER.span(name, kind, **attrs)
+
+
+async def traced_sleep(seconds, name='sleep'):
+    await TRACER.sleep(seconds, name)
+
+
+def record_score(template_name, value):
+    TRACER.score(template_name, value)
@@ -0,0 +1,373 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import cv2
+from concurrent.futures import ThreadPoolExecutor
+from tracing import record_score, trace_span
+
+# Pyramid Matching Settings
+PYRAMID_MIN_TEMPLATE_SIDE = 12  # Never shrink a template below this many pixels
+PYRAMID_MAX_LEVELS = 3
+PYRAMID_CANDIDATES = 3  # Coarse peaks refined at full resolution
+
+# Vision Executor Settings
+VISION_THREADS = 2  # Capture decodes and detector calls running off the event loop at once
+
+# Multi-Template Matching Settings
+MATCH_THREADS = 4  # OpenCV releases the GIL inside matchTemplate
+
+# Frame Change Detection Settings
+FINGERPRINT_SIZE = (64, 64)  # Area-averaged thumbnail compared between attempts
+FINGERPRINT_TOLERANCE = 2  # Max per-block gray difference still treated as the same frame
+
+# Tiled Matching Settings
+TILE_STRIP_HEIGHT = 1080  # Rows per strip when slicing a full-page buffer
+
+# Vision Executor
+_vision_executor = None
+
+
+def configure_vision_executor(max_workers=VISION_THREADS):
+    """(Re)create the executor vision work runs on. Call before the first run_vision."""
+    global _vision_executor
+    if _vision_executor is not None:
+        _vision_executor.shutdown(wait=False)
+    _vision_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='vision')
+    logging.info(f"Vision executor running with {max_workers} worker(s)")
+    return _vision_executor
+
+
+def vision_executor():
+    if _vision_executor is None:
+        configure_vision_executor()
+    return _vision_executor
+
+
+async def run_vision(func, *args, **kwargs):
+    """
+    Await a blocking OpenCV/decode call on the vision executor so pyppeteer's
+    websocket traffic and timers keep running on the event loop meanwhile.
+    The call runs in a copy of the caller's context, so context variables
+    (the traced article, the active recording) are visible to it.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(vision_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+# Template Registry
+class ButtonTemplate:
+    """A button template decoded once at startup, plus the data derived from it."""
+
+    def __init__(self, name, path, image):
+        self.name = name
+        self.path = path
+        self.image = image
+        self.h, self.w = image.shape[:2]
+        self._pyramid = [image]
+        self.level(self.max_levels())  # Built up front so matcher threads only ever read it
+
+    def level(self, n):
+        """Return the template downscaled n times with cv2.pyrDown, cached."""
+        while len(self._pyramid) <= n:
+            self._pyramid.append(cv2.pyrDown(self._pyramid[-1]))
+        return self._pyramid[n]
+
+    def max_levels(self):
+        """How many pyramid levels the template can drop before it gets too small to match."""
+        levels = 0
+        side = min(self.h, self.w)
+        while levels < PYRAMID_MAX_LEVELS and side // 2 >= PYRAMID_MIN_TEMPLATE_SIDE:
+            side //= 2
+            levels += 1
+        return levels
+
+    def center(self, location):
+        """Return the click point for a top-left match location."""
+        return location[0] + self.w // 2, location[1] + self.h // 2
+
+
+class TemplateRegistry:
+    """Loads each template PNG once and hands it out by name."""
+
+    def __init__(self):
+        self._templates = {}
+
+    def load(self, name, path):
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise FileNotFoundError(f"Could not read template image: {path}")
+        self._templates[name] = ButtonTemplate(name, path, image)
+        logging.info(f"Loaded template {name} ({image.shape[1]}x{image.shape[0]}) from {path}")
+        return self._templates[name]
+
+    def load_all(self, paths, missing_ok=False):
+        """Load a {name: path} mapping. With missing_ok, unreadable templates are skipped with a warning."""
+        for name, path in paths.items():
+            try:
+                self.load(name, path)
+            except FileNotFoundError as e:
+                if not missing_ok:
+                    raise
+                logging.warning(f"{e}; template matching that needs {name} is disabled")
+        return self
+
+    def get(self, name):
+        return self._templates[name]
+
+    def __getitem__(self, name):
+        return self._templates[name]
+
+    def __contains__(self, name):
+        return name in self._templates
+
+    def names(self):
+        return list(self._templates)
+
+
+# Coarse-to-Fine Template Matching
+def roi_bounds(shape, roi):
+    """Turn a fractional (left, top, right, bottom) hint into pixel bounds."""
+    height, width = shape[:2]
+    if roi is None:
+        return 0, 0, width, height
+    left, top, right, bottom = roi
+    return int(left * width), int(top * height), int(right * width), int(bottom * height)
+
+
+def _peaks(result, count, suppress_w, suppress_h):
+    """Return up to count (score, loc) peaks of a matchTemplate result."""
+    result = result.copy()
+    peaks = []
+    for _ in range(count):
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val <= -1:
+            break
+        peaks.append((max_val, max_loc))
+        x, y = max_loc
+        result[max(0, y - suppress_h):y + suppress_h + 1, max(0, x - suppress_w):x + suppress_w + 1] = -1
+    return peaks
+
+
+class FramePyramid:
+    """
+    A grayscale frame region and its pyrDown levels. Built once per frame and
+    shared read-only by every template matched against it.
+    """
+
+    def __init__(self, image, roi=None, levels=0):
+        self.x0, self.y0, x1, y1 = roi_bounds(image.shape, roi)
+        self.levels = [image[self.y0:y1, self.x0:x1]]
+        self.build(levels)
+
+    def build(self, levels):
+        while len(self.levels) <= levels:
+            self.levels.append(cv2.pyrDown(self.levels[-1]))
+        return self
+
+    def level(self, n):
+        return self.build(n).levels[n]
+
+
+def _match_in_pyramid(pyramid, template, levels=None):
+    """Coarse-to-fine match of one template against a prebuilt frame pyramid."""
+    region = pyramid.level(0)
+    if region.shape[0] < template.h or region.shape[1] < template.w:
+        return -1.0, None
+
+    if levels is None:
+        levels = template.max_levels()
+
+    coarse = pyramid.level(levels)
+    coarse_template = template.level(levels)
+    if levels == 0 or coarse.shape[0] < coarse_template.shape[0] or coarse.shape[1] < coarse_template.shape[1]:
+        result = cv2.matchTemplate(region, template.image, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, (max_loc[0] + pyramid.x0, max_loc[1] + pyramid.y0)
+
+    scale = 2 ** levels
+    coarse_result = cv2.matchTemplate(coarse, coarse_template, cv2.TM_CCOEFF_NORMED)
+    candidates = _peaks(coarse_result, PYRAMID_CANDIDATES, coarse_template.shape[1] // 2, coarse_template.shape[0] // 2)
+
+    best_val, best_loc = -1.0, None
+    region_h, region_w = region.shape[:2]
+    for _, (cx, cy) in candidates:
+        # Search a window of +/- one coarse pixel (scale full-res pixels) around the candidate
+        left = max(0, cx * scale - scale)
+        top = max(0, cy * scale - scale)
+        right = min(region_w, cx * scale + template.w + scale)
+        bottom = min(region_h, cy * scale + template.h + scale)
+        window = region[top:bottom, left:right]
+        if window.shape[0] < template.h or window.shape[1] < template.w:
+            continue
+        result = cv2.matchTemplate(window, template.image, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val > best_val:
+            best_val = max_val
+            best_loc = (max_loc[0] + left + pyramid.x0, max_loc[1] + top + pyramid.y0)
+    return best_val, best_loc
+
+
+def match_template_pyramid(image, template, roi=None, levels=None):
+    """
+    Match template against a grayscale image, searching a downscaled pyramid
+    first and refining the best candidates at full resolution.
+    Returns (max_val, max_loc) in image coordinates, like cv2.minMaxLoc.
+    """
+    return _match_in_pyramid(FramePyramid(image, roi), template, levels)
+
+
+def locate_template(image, template, threshold, roi=None):
+    """
+    Search the ROI hint first and fall back to the whole frame if nothing
+    in the hinted band clears the threshold. Returns (max_val, max_loc).
+    """
+    max_val, max_loc = match_template_pyramid(image, template, roi)
+    if max_val < threshold and roi is not None:
+        full_val, full_loc = match_template_pyramid(image, template)
+        if full_val > max_val:
+            max_val, max_loc = full_val, full_loc
+    return max_val, max_loc
+
+
+# Multi-Template Matching
+MATCH_EXECUTOR = ThreadPoolExecutor(max_workers=MATCH_THREADS, thread_name_prefix='match')
+
+
+class MatchResult:
+    """Scores for every template matched against one frame, keyed by template name."""
+
+    def __init__(self, scores=None):
+        self.scores = scores or {}  # name -> (max_val, max_loc)
+
+    def __getitem__(self, name):
+        return self.scores[name]
+
+    def __contains__(self, name):
+        return name in self.scores
+
+    def location(self, name, threshold):
+        """Return the match location for name if it cleared threshold, else None."""
+        max_val, max_loc = self.scores.get(name, (-1.0, None))
+        return max_loc if max_val >= threshold else None
+
+    def first(self, names, threshold):
+        """Return (name, max_loc) for the first template in names that cleared threshold."""
+        for name in names:
+            max_loc = self.location(name, threshold)
+            if max_loc is not None:
+                return name, max_loc
+        return None, None
+
+    def best(self):
+        """Return (name, max_val, max_loc) for the highest score."""
+        if not self.scores:
+            return None, -1.0, None
+        name = max(self.scores, key=lambda key: self.scores[key][0])
+        return (name,) + tuple(self.scores[name])
+
+
+def match_templates(image, templates, roi=None, executor=MATCH_EXECUTOR):
+    """
+    Match N templates against one grayscale frame in parallel. The frame is
+    cropped and pyramided once and shared by every worker.
+    """
+    with trace_span('match', templates=len(templates), roi=roi is not None):
+        if len(image.shape) == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        pyramid = FramePyramid(image, roi, max((template.max_levels() for template in templates), default=0))
+        if len(templates) == 1:
+            return MatchResult({templates[0].name: _match_in_pyramid(pyramid, templates[0])})
+        futures = {template.name: executor.submit(_match_in_pyramid, pyramid, template) for template in templates}
+        return MatchResult({name: future.result() for name, future in futures.items()})
+
+
+def locate_templates(image, templates, threshold, roi=None, executor=MATCH_EXECUTOR):
+    """
+    Search the ROI hint first and fall back to the whole frame: templates that
+    miss inside the ROI hint are retried together over the whole frame.
+    """
+    result = match_templates(image, templates, roi, executor)
+    misses = [template for template in templates if result[template.name][0] < threshold]
+    if roi is not None and misses:
+        retry = match_templates(image, misses, None, executor)
+        for name, score in retry.scores.items():
+            if score[0] > result[name][0]:
+                result.scores[name] = score
+    for name, (max_val, _) in result.scores.items():
+        record_score(name, max_val)
+    return result
+
+
+# Tiled Matching
+def strip_offsets(total_height, strip_height, overlap):
+    """
+    Yield the top row of each horizontal strip. Strips overlap by at least the
+    template height so a button straddling a boundary is whole in one strip.
+    """
+    step = max(1, strip_height - overlap)
+    top = 0
+    while True:
+        yield top
+        if top + strip_height >= total_height:
+            break
+        top += step
+
+
+def match_template_tiled(image, template, threshold, strip_height=TILE_STRIP_HEIGHT):
+    """
+    Match a tall image strip by strip, stopping at the first strip that clears
+    the threshold. Only one strip's matchTemplate result is alive at a time.
+    Returns (max_val, max_loc) in image coordinates.
+    """
+    best_val, best_loc = -1.0, None
+    for top in strip_offsets(image.shape[0], strip_height, template.h):
+        max_val, max_loc = match_template_pyramid(image[top:top + strip_height], template)
+        if max_loc is not None and max_val > best_val:
+            best_val, best_loc = max_val, (max_loc[0], max_loc[1] + top)
+        if best_val >= threshold:
+            break
+    return best_val, best_loc
+
+
+# Frame Change Detection
+FRAME_SKIP_STATS = {'matched': 0, 'skipped': 0}  # Totals across every page this run
+
+
+def frame_fingerprint(image):
+    """A block-averaged thumbnail of the frame; cheap enough to compute every attempt."""
+    return cv2.resize(image, FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
+
+
+class FrameChangeDetector:
+    """
+    Remembers the fingerprint of the last matched frame on a page so retries
+    can reuse its MatchResult when a scroll didn't change what is on screen.
+    """
+
+    def __init__(self, tolerance=FINGERPRINT_TOLERANCE):
+        self.tolerance = tolerance
+        self.matched = 0
+        self.skipped = 0
+        self._fingerprint = None
+        self._shape = None
+        self._result = None
+
+    def cached(self, image):
+        """Return the previous MatchResult if image looks unchanged, else None."""
+        if self._result is None or image.shape != self._shape:
+            return None
+        if cv2.absdiff(frame_fingerprint(image), self._fingerprint).max() > self.tolerance:
+            return None
+        self.skipped += 1
+        FRAME_SKIP_STATS['skipped'] += 1
+        return self._result
+
+    def remember(self, image, result):
+        self.matched += 1
+        FRAME_SKIP_STATS['matched'] += 1
+        self._fingerprint = frame_fingerprint(image)
+        self._shape = image.shape
+        self._result = result
+        return result
@@ -0,0 +1,345 @@
+import csv
+import io
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+# Journal Settings
+FSYNC_POLICIES = ('always', 'interval', 'never')
+FSYNC_INTERVAL = 5  # Seconds between fsyncs under the 'interval' policy
+COMPACT_RATIO = 2  # Compact once the journal holds this many lines per unique URL
+COMPACT_MIN_LINES = 1000  # Never bother compacting tiny journals
+WRITE_RETRIES = 3  # Attempts per batch before it is left pending for the next one
+WRITE_RETRY_DELAY = 1  # Seconds, multiplied by the attempt number
+
+# Index Settings
+LOOKUP_BATCH_SIZE = 500  # Stays under SQLite's bound-parameter limit
+MEDIUM_POST_ID = re.compile(r'(?:^|-)([0-9a-f]{8,16})$')
+
+_STOP = object()
+
+
+def canonical_article_id(url):
+    """
+    Medium post URLs end in a hex post ID (.../some-title-95769403c43f or /p/95769403c43f),
+    shared by every variant of the link regardless of host, path or ?source=rss-... query.
+    Anything else falls back to the lowercased host and path.
+    """
+    parsed = urlparse(url.strip())
+    path = parsed.path.rstrip('/')
+    match = MEDIUM_POST_ID.search(path.rsplit('/', 1)[-1])
+    if match:
+        return match.group(1)
+    return f"{parsed.netloc.lower()}{path.lower()}"
+
+
+def _retry_write(write, description):
+    """Call write() up to WRITE_RETRIES times; return None once it succeeds, else the last error."""
+    error = None
+    for attempt in range(1, WRITE_RETRIES + 1):
+        try:
+            write()
+            return None
+        except Exception as e:
+            error = e
+            logging.warning(f"Error writing {description} (attempt {attempt} of {WRITE_RETRIES}): {e}")
+            if attempt < WRITE_RETRIES:
+                time.sleep(WRITE_RETRY_DELAY * attempt)
+    return error
+
+
+def _drain(work_queue):
+    """Block for one queued item, then take whatever else queued up meanwhile."""
+    batch = [work_queue.get()]
+    while not work_queue.empty():
+        batch.append(work_queue.get_nowait())
+    return batch
+
+
+def _csv_line(url):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([url])
+    return buffer.getvalue()
+
+
+class VisitedJournal:
+    """
+    Append-only visited-URL journal in the same one-column CSV format as
+    visited_urls.csv. Each visit is one appended line written by a background
+    thread, so the event loop only ever puts a URL on a queue. A batch that
+    fails to write is retried and kept pending until a later write succeeds;
+    while it is failing, append() raises so the caller hears about it.
+    Duplicate lines are compacted away in the background or at close, and a
+    torn last line left by a crash is dropped on load.
+    """
+
+    def __init__(self, path, fsync_policy='interval'):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}. Expected one of {', '.join(FSYNC_POLICIES)}")
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.urls = set()
+        self.ids = set()
+        self.lines = 0
+        self._queue = queue.Queue()
+        self._writer = None
+        self._file = None
+        self._last_fsync = 0
+        self.error = None  # Set while the writer cannot write, cleared once it can again
+
+    def load(self):
+        """Read the journal into a set, truncating a torn trailing line."""
+        self.urls = set()
+        self.ids = set()
+        self.lines = 0
+        try:
+            with open(self.path, mode='r+b') as file:
+                data = file.read()
+                good_length = data.rfind(b'\n') + 1
+                if good_length < len(data):
+                    logging.info(f"Dropping torn last line of {self.path} ({len(data) - good_length} bytes)")
+                    file.truncate(good_length)
+            for row in csv.reader(io.StringIO(data[:good_length].decode('utf-8'), newline='')):
+                if row:
+                    self.urls.add(row[0])
+                    self.ids.add(canonical_article_id(row[0]))
+                    self.lines += 1
+            logging.info(f"Loaded {len(self.urls)} visited URLs from {self.path}")
+        except FileNotFoundError:
+            logging.info('Visited URLs file not found. A new one will be created.')
+        return self.urls
+
+    def start(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name='visited-journal', daemon=True)
+            self._writer.start()
+
+    def append(self, url):
+        """Record a visit without blocking on disk."""
+        self.urls.add(url)
+        self.ids.add(canonical_article_id(url))
+        self.start()
+        self._queue.put(url)
+        if self.error is not None:
+            raise OSError(f"Visited URLs are not being written to {self.path}, {url} is pending: {self.error}")
+
+    add = append
+
+    def __contains__(self, url):
+        return canonical_article_id(url) in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def unvisited(self, urls):
+        """Return the urls whose article has not been visited, in order."""
+        return [url for url in urls if canonical_article_id(url) not in self.ids]
+
+    def close(self):
+        """Flush pending appends, compact, and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        self.compact()
+
+    def compact(self):
+        """Atomically rewrite the journal with one line per unique URL."""
+        if self.lines <= len(self.urls):
+            return
+        temp_path = self.path + '.compact'
+        with open(temp_path, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            for url in sorted(list(self.urls)):
+                writer.writerow([url])
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        logging.info(f"Compacted {self.path} from {self.lines} to {len(self.urls)} lines")
+        self.lines = len(self.urls)
+
+    def _run(self):
+        pending = []
+        stopping = False
+        try:
+            while not stopping:
+                batch = _drain(self._queue)
+                stopping = _STOP in batch
+                pending.extend(url for url in batch if url is not _STOP)
+                self.error = _retry_write(lambda: self._write(pending, force=stopping), f"visited URLs to {self.path}")
+                if self.error is None:
+                    pending = []
+                    self._maybe_compact()
+            if pending:
+                logging.error(f"Gave up writing {len(pending)} visited URLs to {self.path}: {self.error}")
+        finally:
+            self._close_file()
+
+    def _write(self, urls, force=False):
+        if self._file is None:
+            self._file = open(self.path, mode='a', newline='', encoding='utf-8')
+        try:
+            self._file.write(''.join(_csv_line(url) for url in urls))
+            self._sync(force)
+        except Exception:
+            self._close_file()  # Reopened on the next attempt
+            raise
+        self.lines += len(urls)
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                logging.error(f"Error closing {self.path}: {e}")
+            self._file = None
+
+    def _maybe_compact(self):
+        if self.lines >= COMPACT_MIN_LINES and self.lines >= COMPACT_RATIO * len(self.urls):
+            self._close_file()
+            try:
+                self.compact()
+            except Exception as e:
+                logging.error(f"Error compacting {self.path}: {e}")
+
+    def _sync(self, force=False):
+        self._file.flush()
+        now = time.monotonic()
+        if self.fsync_policy == 'always' or (force and self.fsync_policy != 'never') or \
+                (self.fsync_policy == 'interval' and now - self._last_fsync >= FSYNC_INTERVAL):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+
+class SqliteVisitedIndex:
+    """
+    Persistent visited index in SQLite (WAL mode) keyed on canonical article ID.
+    Lookups are batched IN queries on the caller's connection; inserts go to a
+    background writer thread with its own connection so the event loop never
+    waits on a commit. IDs added this run are also kept in memory so lookups
+    see them before the writer commits. A batch that fails to commit (e.g.
+    database is locked) is retried and kept pending until a later commit
+    succeeds; while it is failing, add() raises so the caller hears about it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._recent = set()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._db_lock = threading.Lock()  # Lookups may come from feed worker threads
+        self.error = None  # Set while the writer cannot commit, cleared once it can again
+        self._db = self._connect()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS visited (article_id TEXT PRIMARY KEY, url TEXT NOT NULL, visited_at REAL NOT NULL)')
+        db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        db.commit()
+        return db
+
+    def load(self):
+        logging.info(f"Opened visited index {self.path} with {len(self)} articles")
+        return self
+
+    def migrate_csv(self, csv_path):
+        """One-time import of a visited_urls.csv file; later calls are no-ops."""
+        if self._db.execute("SELECT 1 FROM meta WHERE key = 'migrated_csv'").fetchone():
+            return 0
+        journal = VisitedJournal(csv_path)
+        urls = journal.load()
+        now = time.time()
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO visited VALUES (?, ?, ?)',
+                                 ((canonical_article_id(url), url, now) for url in urls))
+            self._db.execute("INSERT INTO meta VALUES ('migrated_csv', ?)", (csv_path,))
+        logging.info(f"Migrated {len(urls)} visited URLs from {csv_path} into {self.path}")
+        return len(urls)
+
+    def __len__(self):
+        with self._db_lock:
+            return self._db.execute('SELECT COUNT(*) FROM visited').fetchone()[0]
+
+    def __contains__(self, url):
+        return not self.unvisited([url])
+
+    def visited_ids(self, article_ids):
+        """Return the subset of article_ids already in the index."""
+        found = set(article_id for article_id in article_ids if article_id in self._recent)
+        pending = [article_id for article_id in set(article_ids) if article_id not in found]
+        for start in range(0, len(pending), LOOKUP_BATCH_SIZE):
+            batch = pending[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            with self._db_lock:
+                rows = self._db.execute(f'SELECT article_id FROM visited WHERE article_id IN ({placeholders})', batch).fetchall()
+            found.update(row[0] for row in rows)
+        return found
+
+    def unvisited(self, urls):
+        """Return the urls whose article has not been visited, in order, using batched lookups."""
+        ids = [canonical_article_id(url) for url in urls]
+        visited = self.visited_ids(ids)
+        return [url for url, article_id in zip(urls, ids) if article_id not in visited]
+
+    def add(self, url):
+        """Record a visit without blocking on disk."""
+        self._recent.add(canonical_article_id(url))
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name='visited-index', daemon=True)
+            self._writer.start()
+        self._queue.put((url, time.time()))
+        if self.error is not None:
+            raise sqlite3.OperationalError(f"Visited URLs are not being written to {self.path}, {url} is pending: {self.error}")
+
+    append = add
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        self._db.close()
+
+    def _run(self):
+        db = sqlite3.connect(self.path)
+        pending = []
+        stopping = False
+        try:
+            while not stopping:
+                batch = _drain(self._queue)
+                stopping = _STOP in batch
+                pending.extend(entry for entry in batch if entry is not _STOP)
+                self.error = _retry_write(lambda: self._insert(db, pending), f"visited URLs to {self.path}")
+                if self.error is None:
+                    pending = []
+            if pending:
+                logging.error(f"Gave up writing {len(pending)} visited URLs to {self.path}: {self.error}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _insert(db, entries):
+        with db:
+            db.executemany('INSERT OR IGNORE INTO visited VALUES (?, ?, ?)',
+                           [(canonical_article_id(url), url, visited_at) for url, visited_at in entries])
+
+
+def open_visited_store(kind, csv_path, sqlite_path, fsync_policy='interval'):
+    """Open the visited store named by kind ('sqlite' or 'csv'), migrating the CSV into SQLite on first use."""
+    if kind == 'sqlite':
+        index = SqliteVisitedIndex(sqlite_path)
+        if os.path.exists(csv_path):
+            index.migrate_csv(csv_path)
+        return index.load()
+    if kind == 'csv':
+        journal = VisitedJournal(csv_path, fsync_policy)
+        journal.load()
+        return journal
+    raise ValueError(f"Unknown visited store: {kind}. Expected 'sqlite' or 'csv'")